@@ -3,20 +3,30 @@
 当发现费率 >= 阈值的机会时自动开仓并发送通知
 """
 import asyncio
+import os
 import sys
+import time
 from pathlib import Path
+from dataclasses import dataclass
+from functools import lru_cache
 from decimal import Decimal
 from datetime import datetime, timedelta
 
-ROOT = Path(__file__).parent.parent
-sys.path.insert(0, str(ROOT))
+ROOT = str(Path(__file__).resolve().parent.parent)
+# 已在路径中 (如 supervisor 以 PYTHONPATH 启动) 时不再重复插入
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
 
-from src.exchange import create_exchange, OrderSide, OrderType
+from src.exchange import get_exchange, close_exchanges, warmup, refresh_markets, keep_alive, OrderSide, OrderType, BinanceMarketStream, RateTick, RATE_SCALE
 from src.strategy.scanner import Scanner
 from src.strategy.executor import Executor
 from src.core.funding_tracker import funding_tracker
+from src.core.opportunity_log import opportunity_log
 from src.core.risk import RiskManager, RiskAction
-from src.utils import setup_logger, logger, config, telegram, format_rate, format_usdt
+from src.utils import (
+    setup_logger, logger, config, telegram, format_rate, format_usdt,
+    next_funding_time, time_to_next_funding, install_uvloop,
+)
 
 
 # ==================== 配置参数 ====================
@@ -24,14 +34,177 @@ MIN_RATE_THRESHOLD = Decimal("0.0001")   # 0.01% (极低阈值，确保开仓)
 EXIT_RATE_THRESHOLD = Decimal("0.0000") # 0.00% 离场阈值 (只要不亏就不走)
 POSITION_SIZE = Decimal("12")          # 每次开仓金额 (USDT)
 MAX_POSITIONS = 3                      # 最多同时持仓数量
-SCAN_INTERVAL = 300                    # 扫描间隔（秒）5分钟
+SCAN_INTERVAL = 300                    # 维护间隔（秒）5分钟: 对账/风控/播报，开仓由行情推送触发
+PRE_FUNDING_LEAD = 60                  # 结算前提前维护的时间（秒）
+STATUS_INTERVAL = 300                  # 状态播报间隔（秒），独立于维护循环
 
 # 安全限制
 MIN_DEPTH = Decimal("3000")            # 最小流动性深度 (5000U 适合小资金)
 MAX_SPREAD = Decimal("0.005")          # 最大价差 0.5%
+SIGNAL_FETCH_TIMEOUT = 3.0             # 推送触发后单个交易对快照超时 (秒)
+WAKE_DEBOUNCE = 60                     # 同一交易对费率反向提前维护的最短间隔 (秒)
+# 持仓费率反向的判定阈值: 越过持仓不利一侧超过此值才算反转 (与风控的费率反转阈值一致)
+REVERSAL_RATE_THRESHOLD = Decimal(str(config.risk_config.get("rate_reversal", {}).get("threshold", 0.0001)))
+SNAPSHOT_TTL = min(SCAN_INTERVAL, 10)  # 余额/持仓快照缓存时间 (秒)，同一轮维护共用一次请求
+
+# 推送热路径使用的整数阈值 (模块加载时换算一次)
+MIN_RATE_TICKS = int(MIN_RATE_THRESHOLD * RATE_SCALE)
+REVERSAL_TICKS = int(REVERSAL_RATE_THRESHOLD * RATE_SCALE)
+SCAN_INTERVAL_NS = SCAN_INTERVAL * 1_000_000_000
+
+# 持仓/状态循环使用的 Decimal 常量 (避免每次循环重新构造)
+ZERO = Decimal(0)
+FEE_RATE_TOTAL = Decimal("0.003")      # 开平仓总手续费 (现货 0.1% x2 + 合约 0.05% x2)
+FEE_PERIODS = 90                       # 手续费摊销期数 (持仓 30 天)
+PERIODS_PER_DAY = 3                    # 每天结算期数
+SPOT_HEDGE_TOLERANCE = Decimal("0.9")  # 现货覆盖合约数量的最低比例 (允许 10% 误差/磨损)
+SPOT_FEE_RESERVE = Decimal("0.99")     # 现货可用余额比例 (预留 1% 摩擦成本)
+MARGIN_SAFETY_RATIO = Decimal("2")     # 合约保证金安全系数
+MIN_PERP_QTY = Decimal("0.001")        # 视为有合约持仓的最小数量
+PERP_MARGIN_BUFFER = Decimal("0.6")    # 开仓所需合约余额占仓位比例
+DUST_VALUE = Decimal("1")              # 低于此估值 (USDT) 的现货余额视为零头，不计入权益
+DUST_QTY = Decimal("0.000001")         # 无价格缓存时视为零头的数量
+# ==================================================
+
+# ==================== Telegram 消息模板 ====================
+# 导入时定义一次；数值以 float 传入，避免逐条消息走 Decimal.__format__
+_OPEN_DETAIL_TMPL = (
+    "📊 <b>开仓详情</b>\n"
+    "费率: <code>{rate_pct:+.4f}%</code>\n"
+    "预计日收益: <code>${income:.2f}</code>\n"
+    "深度: <code>${depth:.0f}</code>\n"
+    "价差: <code>{spread:.4%}</code>\n"
+)
+_OPEN_FAILED_TMPL = "❌ 开仓失败\n\n交易对: {symbol}\n费率: {rate_pct:+.4f}%"
+_OPEN_ERROR_TMPL = "⚠️ 开仓异常\n\n交易对: {symbol}\n错误: {error}"
+_ROTATE_TMPL = (
+    "🔄 <b>执行资金轮动</b>\n\n"
+    "卖出: {old_symbol} (盈亏 {pnl})\n"
+    "买入: {new_symbol} (费率 {new_rate})\n"
+    "原因: 费率提升 {rate_gain}"
+)
+_AUTO_CLOSE_TMPL = (
+    "👋 <b>自动平仓通知</b>\n\n"
+    "交易对: {symbol}\n"
+    "原因: {reason}\n"
+    "最终盈亏: <code>${pnl:.2f}</code>"
+)
 # ==================================================
 
 
+@dataclass(frozen=True, slots=True)
+class TradeConfig:
+    """运行参数快照 (导入时固定)，热路径绑定为局部变量后按槽位读取"""
+    min_rate_threshold: Decimal
+    min_rate_ticks: int
+    reversal_ticks: int
+    max_spread: Decimal
+    min_depth: Decimal
+    position_size: Decimal
+    required_perp: Decimal
+
+
+@lru_cache(maxsize=4096)
+def _D(value) -> Decimal:
+    """ccxt 返回值 (str/float/int) 转 Decimal，余额、持仓数量等重复值直接命中缓存"""
+    return Decimal(value) if isinstance(value, (int, Decimal)) else Decimal(str(value))
+
+
+CFG = TradeConfig(
+    min_rate_threshold=MIN_RATE_THRESHOLD,
+    min_rate_ticks=MIN_RATE_TICKS,
+    reversal_ticks=REVERSAL_TICKS,
+    max_spread=MAX_SPREAD,
+    min_depth=MIN_DEPTH,
+    position_size=POSITION_SIZE,
+    required_perp=POSITION_SIZE * PERP_MARGIN_BUFFER,
+)
+
+
+@dataclass(slots=True)
+class PerpView:
+    """合约持仓的数值视图 (从 ccxt 原始结构解析一次)"""
+    amt: Decimal                  # 持仓数量 (空头为负)
+    entry: Decimal                # 开仓均价
+    upnl: Decimal                 # 未实现盈亏
+    leverage: int
+    mark: Decimal | None = None   # 标记价格
+
+
+def build_perp_views(perp_positions: list) -> dict[str, PerpView]:
+    """解析合约持仓为 {symbol: PerpView}，字段异常的条目跳过"""
+    views = {}
+    for p in perp_positions:
+        info = p.get("info", {})
+        try:
+            mark = p.get("markPrice") or info.get("markPrice")
+            views[p["symbol"]] = PerpView(
+                amt=_D(info.get("positionAmt") or 0),
+                entry=_D(info.get("entryPrice") or 0),
+                upnl=_D(p.get("unRealizedProfit") or info.get("unRealizedProfit") or 0),
+                leverage=int(float(info.get("leverage") or p.get("leverage") or 1)),
+                mark=_D(mark) if mark else None,
+            )
+        except Exception as e:
+            logger.debug(f"解析合约持仓失败 {p.get('symbol')}: {e}")
+    return views
+
+
+class _ExchangeSnapshotCache:
+    """
+    账户快照缓存 (现货余额、合约余额、合约持仓)
+    按接口缓存 (value, expires_at)，过期或下单后失效再重新请求
+    """
+    
+    def __init__(self, exchange, ttl: float = SNAPSHOT_TTL):
+        self.exchange = exchange
+        self.ttl = ttl
+        self._entries: dict[str, tuple[object, float]] = {}
+        # 同一接口并发未命中时只发一次请求
+        self._locks: dict[str, asyncio.Lock] = {}
+    
+    async def _get(self, key: str, fetch):
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            value = await fetch()
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            return value
+    
+    async def get_spot_balance(self) -> dict:
+        return await self._get("spot_balance", self.exchange.spot.fetch_balance)
+    
+    async def get_perp_balance(self) -> dict:
+        return await self._get("perp_balance", self.exchange.perp.fetch_balance)
+    
+    async def get_perp_positions(self) -> list:
+        return await self._get("perp_positions", self.exchange.perp.fetch_positions)
+    
+    async def get_perp_views(self) -> dict[str, PerpView]:
+        """合约持仓数值视图，与持仓快照同生命周期，每个快照只解析一次"""
+        async def build():
+            return build_perp_views(await self.get_perp_positions())
+        return await self._get("perp_views", build)
+    
+    async def get_free(self, currency: str = "USDT") -> tuple[Decimal, Decimal]:
+        """现货/合约可用余额"""
+        spot, perp = await asyncio.gather(self.get_spot_balance(), self.get_perp_balance())
+        return (
+            _D(spot.get(currency, {}).get("free", 0)),
+            _D(perp.get(currency, {}).get("free", 0)),
+        )
+    
+    def invalidate(self) -> None:
+        """下单/平仓后账户已变化，丢弃全部快照"""
+        self._entries.clear()
+
+
 class AutoTrader:
     """自动交易机器人"""
     
@@ -43,8 +216,27 @@ class AutoTrader:
         self.scanner = None
         self.executor = None
         self.risk_manager = None
+        self.stream = None
         self.running = True
-        self.last_funding_check = datetime.now()
+        
+        # 行情推送的最新整数费率 {symbol: ticks}
+        self._rate_ticks: dict[str, int] = {}
+        # 行情推送触发的待评估交易对
+        self._pending_entries: set[str] = set()
+        self._entry_task = None
+        # 开仓/平仓互斥，避免推送触发与定期维护并发操作持仓
+        self._trade_lock = asyncio.Lock()
+        # 提前唤醒维护循环 (持仓费率反向)，同一交易对按 WAKE_DEBOUNCE 去抖 {symbol: 上次唤醒的单调时钟}
+        self._wake = asyncio.Event()
+        self._last_wake: dict[str, float] = {}
+        # 已记录费率收入的结算时刻，同一期只记录一次 (提前唤醒会在结算窗口内多次维护)
+        self._income_settlement: datetime | None = None
+        # 余额/持仓短时快照，状态、对账、容量检查共用
+        self._snapshot = None
+        # 上次状态播报取到的现货价格 {symbol: price}，用于过滤零头余额
+        self._last_prices: dict[str, Decimal] = {}
+        # 进行中的状态构建，并发调用方共享同一次结果
+        self._status_inflight: asyncio.Task | None = None
 
     async def sync_funding_history(self):
         """从交易所同步资金费流水到本地"""
@@ -60,106 +252,167 @@ class AutoTrader:
         except Exception as e:
             logger.error(f"同步资金流水失败: {e}")
     
+    async def _fetch_spot_prices(self, symbols: set[str]) -> dict[str, Decimal]:
+        """获取现货最新价，获取失败的交易对不在结果中"""
+        if not symbols:
+            return {}
+        
+        prices = {}
+        # 一次批量请求取回全部价格
+        try:
+            tickers = await self.exchange.spot.fetch_tickers(list(symbols))
+        except Exception as e:
+            logger.warning(f"批量获取现货行情失败: {e}")
+            tickers = {}
+        for symbol in symbols:
+            last = tickers.get(symbol, {}).get("last")
+            if last is not None:
+                prices[symbol] = _D(last)
+        
+        # 批量结果缺失的交易对逐个并发补取
+        missing = [s for s in symbols if s not in prices]
+        if missing:
+            results = await asyncio.gather(
+                *(self.exchange.spot.fetch_ticker(s) for s in missing),
+                return_exceptions=True,
+            )
+            for symbol, ticker in zip(missing, results):
+                if isinstance(ticker, Exception) or ticker.get("last") is None:
+                    continue
+                prices[symbol] = _D(ticker["last"])
+        return prices
+    
+    async def _get_rate(self, symbol: str):
+        """
+        获取费率: 扫描器缓存 (推送/扫描) 未过期时直接使用，否则使用按结算节奏缓存的快照
+        扫描器缓存本身不过期 (推送断开或未覆盖的交易对会停在旧值)，按快照缓存的有效期判断新鲜度；
+        重新请求到的费率同步写回扫描器，各处读取同一份数据
+        """
+        rate_info = self.scanner.get_cached_rate(symbol)
+        if rate_info and funding_tracker.is_fresh(rate_info):
+            return rate_info
+        
+        rate_info = await funding_tracker.fetch_rate(self.exchange, symbol)
+        self.scanner.update_rate(rate_info)
+        return rate_info
+    
     async def _get_portfolio_status(self):
         """
         获取投资组合综合状态 (余额、收入、持仓价值、累计收益、回本周期)
+        已有构建在进行时直接等待其结果，不重复请求
         """
-        # 1. 获取现货/合约余额并换算总权益
-        spot_balances = await self.exchange.spot.fetch_balance()
-        perp_balances = await self.exchange.perp.fetch_balance()
+        if self._status_inflight is None:
+            self._status_inflight = asyncio.create_task(self._build_portfolio_status())
+            self._status_inflight.add_done_callback(self._clear_status_inflight)
+        # shield: 单个调用方被取消不影响其他等待者
+        return await asyncio.shield(self._status_inflight)
+    
+    def _clear_status_inflight(self, task: asyncio.Task) -> None:
+        if self._status_inflight is task:
+            self._status_inflight = None
+    
+    async def _build_portfolio_status(self):
+        """构建投资组合状态 (由 _get_portfolio_status 调用)"""
+        # 1. 并发获取现货/合约余额和合约持仓，换算总权益
+        async def fetch_perp_views() -> dict[str, PerpView]:
+            # 持仓获取失败不影响余额播报
+            try:
+                return await self._snapshot.get_perp_views()
+            except Exception as e:
+                logger.warning(f"获取合约数据失败: {e}")
+                return {}
+        
+        spot_balances, perp_balances, perp_views = await asyncio.gather(
+            self._snapshot.get_spot_balance(),
+            self._snapshot.get_perp_balance(),
+            fetch_perp_views(),
+        )
 
-        spot_equity = Decimal("0")
+        spot_assets = {}
         for asset, bal in spot_balances.items():
             if not isinstance(bal, dict):
                 continue
-            qty = Decimal(str(bal.get("total", 0)))
+            qty = _D(bal.get("total", 0))
             if qty == 0:
                 continue
-            if asset == "USDT":
-                spot_equity += qty
-            else:
-                try:
-                    ticker = await self.exchange.spot.fetch_ticker(f"{asset}/USDT")
-                    price = Decimal(str(ticker["last"]))
-                    spot_equity += qty * price
-                except Exception:
-                    continue
+            # 零头余额 (历史成交残留) 对权益几乎无贡献，不再请求行情
+            last_price = self._last_prices.get(f"{asset}/USDT")
+            if asset != "USDT" and (qty * last_price < DUST_VALUE if last_price else qty < DUST_QTY):
+                continue
+            spot_assets[asset] = qty
+
+        # 托管持仓直接使用合约标记价格 (与现货价差在基点级别，播报足够)
+        mark_prices = {}
+        for symbol in self.executor.positions:
+            view = perp_views.get(symbol)
+            if view and view.mark:
+                mark_prices[symbol] = view.mark
+
+        # 现货资产与缺少标记价格的托管持仓一次性批量获取现货价格
+        price_symbols = {f"{asset}/USDT" for asset in spot_assets if asset != "USDT"}
+        price_symbols.update(
+            f"{pos.base_currency}/USDT"
+            for symbol, pos in self.executor.positions.items()
+            if symbol not in mark_prices
+        )
+        spot_prices = await self._fetch_spot_prices(price_symbols)
+        self._last_prices.update(spot_prices)
+
+        spot_equity = sum(
+            (
+                qty if asset == "USDT" else qty * spot_prices[f"{asset}/USDT"]
+                for asset, qty in spot_assets.items()
+                if asset == "USDT" or f"{asset}/USDT" in spot_prices
+            ),
+            ZERO,
+        )
 
         # 合约账户权益 (钱包余额 + 未实现盈亏更稳妥；若接口无该字段则退回 total)
-        perp_wallet = Decimal(str(perp_balances.get("USDT", {}).get("total", 0)))
-        perp_unrealized = Decimal("0")
-        try:
-            perp_positions = await self.exchange.perp.fetch_positions()
-            for p in perp_positions:
-                pnl = Decimal(str(p.get("unRealizedProfit") or p.get("info", {}).get("unRealizedProfit") or 0))
-                perp_unrealized += pnl
-        except Exception:
-            pass
+        perp_wallet = _D(perp_balances.get("USDT", {}).get("total", 0))
+        perp_unrealized = sum((view.upnl for view in perp_views.values()), ZERO)
         perp_equity = perp_wallet + perp_unrealized
 
-        spot_bal = Decimal(str(spot_balances.get("USDT", {}).get("free", 0)))
-        perp_bal = Decimal(str(perp_balances.get("USDT", {}).get("free", 0)))
+        spot_bal = _D(spot_balances.get("USDT", {}).get("free", 0))
+        perp_bal = _D(perp_balances.get("USDT", {}).get("free", 0))
         total_bal = spot_equity + perp_equity
         
-        # 2. 获取收入统计
+        # 2. 获取收入统计 (一次读取账本，按交易对汇总的收入供持仓循环直接查表)
         summary = funding_tracker.get_summary()
-        funding_sum_positions = Decimal("0")
+        income_by_symbol = summary["by_symbol"]
         
-        # 3. 计算持仓信息
-        total_net_pnl = Decimal("0")
-        total_position_value = Decimal("0")
+        # 3. 计算持仓信息 (逐个构建明细，合计值最后统一汇总)
         details = []
         
-        # 获取最新的合约持仓数据
-        perp_map = {}
-        try:
-            positions = await self.exchange.perp.fetch_positions()
-            for p in positions:
-                perp_map[p['symbol']] = p
-        except Exception as e:
-            logger.warning(f"获取合约数据失败: {e}")
-            
         # 遍历本地记录的套利持仓 (已托管)
-        managed_symbols = set()
-        
         for symbol, pos in self.executor.positions.items():
-            managed_symbols.add(symbol)
             try:
                 # A. 计算持仓价值（现货与合约分别）
-                spot_symbol = f"{pos.base_currency}/USDT"
-                ticker = await self.exchange.spot.fetch_ticker(spot_symbol)
-                current_price = Decimal(str(ticker['last']))
+                current_price = mark_prices.get(symbol) or spot_prices[f"{pos.base_currency}/USDT"]
                 # 优先用交易所实际合约数量估算名义价值，避免本地记录不一致
                 actual_perp_qty = pos.perp_qty
-                if symbol in perp_map:
-                    actual_perp_qty = Decimal(str(perp_map[symbol]['info']['positionAmt']))
-                spot_total_qty = Decimal(str(spot_balances.get(pos.base_currency, {}).get('total', 0)))
+                if symbol in perp_views:
+                    actual_perp_qty = perp_views[symbol].amt
+                spot_total_qty = _D(spot_balances.get(pos.base_currency, {}).get('total', 0))
                 spot_value = spot_total_qty * current_price
                 perp_value = abs(actual_perp_qty) * current_price
                 position_value = perp_value
-                total_position_value += position_value
                 
                 # B. 获取累计费率收益 (从 funding_tracker 获取)
-                funding_earned = funding_tracker.get_total_income(symbol)
-                funding_sum_positions += funding_earned
+                funding_earned = income_by_symbol.get(symbol, ZERO)
 
                 # 手续费估算（现货0.1%*2 + 合约0.05%*2 ≈0.3%名义仓位）
-                total_fees = position_value * Decimal("0.003")
+                total_fees = position_value * FEE_RATE_TOTAL
                 net_income_after_fee = funding_earned - total_fees
                 
                 # C. 获取当前费率
-                rate_info = self.scanner.get_cached_rate(symbol)
-                if not rate_info:
-                    rate_info = await self.exchange.get_funding_rate(symbol)
-                current_rate = rate_info.rate if rate_info else Decimal(0)
+                rate_info = await self._get_rate(symbol)
+                current_rate = rate_info.rate if rate_info else ZERO
                 
                 # D. 计算每期净收益 (费率收入 - 手续费摊销)
                 # 每期费率收入
                 funding_income_per_period = position_value * abs(current_rate)
-                # 估算开平仓总手续费 (现货 0.1% x2 + 合约 0.05% x2)
-                total_fees = position_value * Decimal("0.003")  # 0.3% 总成本
-                # 假设持仓 30 天 (90期) 后平仓，每期摊销的手续费
-                fee_per_period = total_fees / 90
+                # 假设持仓 30 天 (90期) 后平仓，每期摊销的手续费 (总手续费同上)
+                fee_per_period = total_fees / FEE_PERIODS
                 # 每期净收益
                 net_per_period = funding_income_per_period - fee_per_period
                 
@@ -172,7 +425,7 @@ class AutoTrader:
                 elif funding_income_per_period > 0:
                     # 使用当期费率收入估算 (不减去摊销，因为手续费是固定成本，不是每期产生)
                     periods_to_breakeven = remaining_to_breakeven / funding_income_per_period
-                    days = periods_to_breakeven / 3  # 每天3期
+                    days = periods_to_breakeven / PERIODS_PER_DAY
                     if days > 100:
                         payback_text = ">100天"
                     elif days < 1:
@@ -184,11 +437,10 @@ class AutoTrader:
                 
                 # F. 计算浮动盈亏 (用于参考)
                 spot_pnl = (current_price - pos.spot_avg_price) * pos.spot_qty
-                perp_pnl = Decimal("0")
-                if symbol in perp_map:
-                    perp_pnl = Decimal(str(perp_map[symbol]['info']['unRealizedProfit']))
+                perp_pnl = ZERO
+                if symbol in perp_views:
+                    perp_pnl = perp_views[symbol].upnl
                 unrealized_net_pnl = spot_pnl + perp_pnl
-                total_net_pnl += unrealized_net_pnl
                 
                 details.append({
                     'symbol': symbol,
@@ -213,31 +465,33 @@ class AutoTrader:
                 logger.error(f"计算 {symbol} 状态失败: {e}")
         
         # 检查未托管的合约持仓 (Exchange has it, but Bot doesn't track it)
-        for symbol, p_data in perp_map.items():
-            if symbol not in managed_symbols and float(p_data['info']['positionAmt']) != 0:
+        for symbol, view in perp_views.items():
+            if symbol not in self.executor.positions and view.amt != 0:
                 try:
-                    pnl = Decimal(str(p_data['info']['unRealizedProfit']))
-                    amt = Decimal(str(p_data['info']['positionAmt']))
-                    entry_price = Decimal(str(p_data['info']['entryPrice']))
+                    pnl = view.upnl
+                    amt = view.amt
+                    entry_price = view.entry
                     pos_value = abs(amt) * entry_price
-                    total_position_value += pos_value
                     
                     details.append({
                         'symbol': symbol,
                         'position_value': pos_value,
-                        'funding_earned': Decimal(0),
-                        'current_rate': Decimal(0),
-                        'net_per_period': Decimal(0),
+                        'funding_earned': ZERO,
+                        'current_rate': ZERO,
+                        'net_per_period': ZERO,
                         'payback_by_income': "⚠️ 未托管",
                         'managed': False,
                         'pnl': pnl,
                         'amt': amt,
                         'entry_price': entry_price,
                     })
-                    total_net_pnl += pnl
                 except Exception as e:
                     logger.error(f"处理未托管持仓 {symbol} 失败: {e}")
                 
+        total_position_value = sum((d['position_value'] for d in details), ZERO)
+        total_net_pnl = sum((d['pnl'] for d in details), ZERO)
+        funding_sum_positions = sum((d['funding_earned'] for d in details), ZERO)
+
         return {
             "spot_bal": spot_bal,
             "perp_bal": perp_bal,
@@ -268,25 +522,29 @@ class AutoTrader:
         if not self.executor.positions:
             return
 
+        # 记录到日志 (这里做了一个简单的模拟记录，实际应当判断时间)
+        # 仅当分钟数为 0-5 分时记录 (模拟结算时刻)
+        if not (now.minute < 5 and now.hour % 8 == 0): # UTC 0, 8, 16
+            return
+        
+        settlement = now.replace(minute=0, second=0, microsecond=0)
+        if settlement == self._income_settlement:
+            return
+
         try:
-            # 遍历持仓更新费率
+            # 遍历持仓收集本期费率，最后一次写入
+            entries = []
             for symbol, position in self.executor.positions.items():
                 # 获取最新费率
                 rate_info = self.scanner.get_cached_rate(symbol)
-                current_rate = rate_info.rate if rate_info else Decimal(0)
-                
-                # 估算本期收入
-                income = position.notional_value * abs(current_rate)
-                
-                # 记录到日志 (这里做了一个简单的模拟记录，实际应当判断时间)
-                # 仅当分钟数为 0-5 分时记录 (模拟结算时刻)
-                if now.minute < 5 and (now.hour % 8 == 0): # UTC 0, 8, 16
-                   funding_tracker.record_funding(
-                       symbol=symbol,
-                       rate=current_rate,
-                       position_value=position.notional_value
-                   )
-                   logger.info(f"💰 记录资金费收入: {symbol} +{income:.4f} U")
+                current_rate = rate_info.rate if rate_info else ZERO
+                entries.append((symbol, current_rate, position.notional_value))
+            
+            records = funding_tracker.record_many(entries)
+            self._income_settlement = settlement
+            if records:
+                total = sum((r.income for r in records), ZERO)
+                logger.info(f"💰 记录资金费收入: {len(records)} 个交易对, 合计 +{total:.4f} U")
                    
         except Exception as e:
             logger.error(f"记录资金费出错: {e}")
@@ -298,35 +556,35 @@ class AutoTrader:
         try:
             logger.info("  🔄 检查未托管的持仓...")
             
-            # 1. 获取所有通过API能看到的合约持仓
-            perp_positions = await self.exchange.perp.fetch_positions()
-            perp_map = {p['symbol']: p for p in perp_positions if float(p['info']['positionAmt']) != 0}
+            # 1. 并发获取所有通过API能看到的合约持仓和现货余额
+            perp_views, spot_balances = await asyncio.gather(
+                self._snapshot.get_perp_views(),
+                self._snapshot.get_spot_balance(),
+            )
+            perp_map = {symbol: view for symbol, view in perp_views.items() if view.amt != 0}
             
             if not perp_map:
                 return
-
-            # 2. 获取现货余额
-            spot_balances = await self.exchange.spot.fetch_balance()
             
             from src.strategy.executor import ArbitragePosition, _get_position_store
             
             newly_adopted = []
             
-            for symbol, p_data in perp_map.items():
+            for symbol, view in perp_map.items():
                 # 如果已经在托管列表中，跳过
                 if symbol in self.executor.positions:
                     continue
                     
                 # 解析基础币种 (e.g. BTC/USDT:USDT -> BTC)
                 base = symbol.split('/')[0]
-                perp_amt = Decimal(str(p_data['info']['positionAmt']))
-                perp_entry_price = Decimal(str(p_data['info']['entryPrice']))
+                perp_amt = view.amt
+                perp_entry_price = view.entry
                 
                 # 检查现货余额是否足够对冲 (允许 10% 的误差/磨损)
-                spot_free = Decimal(str(spot_balances.get(base, {}).get('free', 0)))
+                spot_free = _D(spot_balances.get(base, {}).get('free', 0))
                 target_spot_qty = abs(perp_amt)
                 
-                if spot_free >= target_spot_qty * Decimal("0.9"):
+                if spot_free >= target_spot_qty * SPOT_HEDGE_TOLERANCE:
                     logger.info(f"  🔍 发现未托管持仓 {symbol}, 现货余额充足 ({spot_free}), 正在认领...")
                     
                     # 创建新的套利持仓对象
@@ -341,21 +599,20 @@ class AutoTrader:
                         perp_qty=perp_amt,
                         perp_avg_price=perp_entry_price,
                         perp_value=perp_amt * perp_entry_price,
-                        leverage=int(p_data['info']['leverage']),
+                        leverage=view.leverage,
                         opened_at=datetime.now() # 记录认领时间
                     )
                     
-                    # 保存到内存和文件
+                    # 先放入内存，循环结束后一次写入文件
                     self.executor.positions[symbol] = new_pos
-                    _get_position_store().save(new_pos)
-                    
                     newly_adopted.append(symbol)
                     
             if newly_adopted:
+                _get_position_store().save_many(self.executor.positions[s] for s in newly_adopted)
                 msg = f"✅ 已自动认领 {len(newly_adopted)} 个未托管持仓: {', '.join(newly_adopted)}"
                 logger.info(msg)
                 if telegram.enabled:
-                    await telegram.send_message(f"🔄 <b>同步持仓</b>\n{msg}\n(注: 现货成本已按合约开仓价估算)")
+                    await telegram.send_message(f"🔄 <b>同步持仓</b>\n{msg}\n(注: 现货成本已按合约开仓价估算)", wait=False)
                     
         except Exception as e:
             logger.error(f"同步未托管持仓失败: {e}")
@@ -380,36 +637,55 @@ class AutoTrader:
         except Exception as e:
             logger.error(f"发送定期报告失败: {e}")
 
+    async def status_loop(self):
+        """定期状态播报 (独立任务，不占用维护循环时间)"""
+        while self.running:
+            await asyncio.sleep(STATUS_INTERVAL)
+            await self.send_periodic_status()
+
     async def start(self):
         """启动自动交易"""
-        logger.info("=" * 70)
-        logger.info("🤖 自动套利交易机器人启动")
-        logger.info("=" * 70)
-        logger.info(f"  费率阈值: {format_rate(MIN_RATE_THRESHOLD)} (超过此值自动开仓)")
-        logger.info(f"  离场阈值: {format_rate(EXIT_RATE_THRESHOLD)} (低于此值自动平仓)")
-        logger.info(f"  单笔仓位: {format_usdt(POSITION_SIZE)}")
-        logger.info(f"  最大持仓: 自动管理 (基于余额+2x安全边际)")
-        logger.info(f"  扫描间隔: {SCAN_INTERVAL} 秒")
-        logger.info(f"  Telegram: {'✅ 已启用' if telegram.enabled else '⚠️  未配置'}")
-        logger.info("=" * 70)
-        logger.info("")
-        
-        self.exchange = create_exchange("binance", testnet=False)
+        # 启动横幅拼成一条日志输出
+        logger.info("\n".join([
+            "",
+            "=" * 70,
+            "🤖 自动套利交易机器人启动",
+            "=" * 70,
+            f"  费率阈值: {format_rate(MIN_RATE_THRESHOLD)} (超过此值自动开仓)",
+            f"  离场阈值: {format_rate(EXIT_RATE_THRESHOLD)} (低于此值自动平仓)",
+            f"  单笔仓位: {format_usdt(POSITION_SIZE)}",
+            f"  最大持仓: 自动管理 (基于余额+2x安全边际)",
+            f"  开仓触发: 行情推送 (费率上穿阈值)",
+            f"  维护间隔: {SCAN_INTERVAL} 秒",
+            f"  Telegram: {'✅ 已启用' if telegram.enabled else '⚠️  未配置'}",
+            "=" * 70,
+        ]))
+
+        self.exchange = get_exchange("binance", testnet=False)
+        self._snapshot = _ExchangeSnapshotCache(self.exchange)
         self.scanner = Scanner(self.exchange)
         self.executor = Executor(self.exchange, load_positions=True)
         self.risk_manager = RiskManager()
+        # 最优挂单直接写入扫描器缓存，推送热路径少一层回调
+        self.stream = BinanceMarketStream(on_rates=self.on_rates, on_book=self.scanner.update_book)
+        
+        # 启动时一次性加载现货/合约市场信息，避免首个请求承担加载延迟
+        try:
+            await warmup(self.exchange)
+        except Exception as e:
+            logger.warning(f"预加载市场信息失败: {e}")
         
         # 同步未托管的持仓
         await self.sync_orphan_positions()
         # 同步交易所资金流水到本地
         await self.sync_funding_history()
         
-        # 检查账户状态并发送报告
-        try:
-            logger.info("正在获取账户权益报告...")
-            status = await self._get_portfolio_status()
+        # 检查账户状态并发送报告 (报告只发往 Telegram，未启用时不构建)
+        if telegram.enabled:
+            try:
+                logger.info("正在获取账户权益报告...")
+                status = await self._get_portfolio_status()
 
-            if telegram.enabled:
                 await telegram.notify_startup_status(
                     spot_balance=status["spot_bal"],
                     perp_balance=status["perp_bal"],
@@ -425,49 +701,220 @@ class AutoTrader:
                     f"费率阈值: <code>{MIN_RATE_THRESHOLD*100:.2f}%</code>\n"
                     f"单笔仓位: <code>${POSITION_SIZE}</code>\n"
                     f"最大持仓: <code>自动管理 (基于资金)</code>\n"
-                    f"扫描间隔: <code>{SCAN_INTERVAL} 秒</code>"
+                    f"开仓触发: <code>行情推送</code>\n"
+                    f"维护间隔: <code>{SCAN_INTERVAL} 秒</code>"
                 )
-        except Exception as e:
-            logger.error(f"发送启动报告失败: {e}")
-        
+            except Exception as e:
+                logger.error(f"发送启动报告失败: {e}")
+
+        stream_task = None
+        status_task = None
+        refresh_task = None
+        keepalive_task = None
         try:
+            # 先对账/风控，再全量扫描一次初始化费率缓存与现货市场
+            await self.maintain()
+            await self.scan_and_trade()
+
+            # 之后开仓完全由行情推送驱动，主循环只做定期维护
+            stream_task = asyncio.create_task(self.stream.run())
+            # 市场信息每小时后台刷新 (新上线交易对)，不在扫描中重复加载
+            refresh_task = asyncio.create_task(refresh_markets(self.exchange))
+            # 保持 REST 连接，推送触发开仓时下单不再重新握手
+            keepalive_task = asyncio.create_task(keep_alive(self.exchange))
+            if telegram.enabled:
+                status_task = asyncio.create_task(self.status_loop())
+
+            # 按单调时钟的固定节拍维护，不受维护耗时和系统校时影响；
+            # 另外在每次结算前 PRE_FUNDING_LEAD 秒，以及持仓费率反向时提前唤醒
+            next_ns = time.monotonic_ns() + SCAN_INTERVAL_NS
+            pre_funding_done = None  # 已执行过结算前维护的结算时间
             while self.running:
-                await self.scan_and_trade()
-                await self.check_funding_income()
-                
-                # 发送定期状态报告
-                await self.send_periodic_status()
+                timeout = max(0, next_ns - time.monotonic_ns()) / 1e9
+                if next_funding_time() != pre_funding_done:
+                    timeout = min(timeout, max(0, time_to_next_funding() - PRE_FUNDING_LEAD))
                 
-                logger.info(f"⏳ 等待 {SCAN_INTERVAL} 秒后再次扫描...")
+                logger.info(f"⏳ {timeout:.0f} 秒后执行下一轮维护 (开仓由行情推送触发)")
                 logger.info("")
-                await asyncio.sleep(SCAN_INTERVAL)
-        
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                    logger.info("⚡ 持仓费率反向，提前执行维护")
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                
+                if time_to_next_funding() <= PRE_FUNDING_LEAD:
+                    pre_funding_done = next_funding_time()
+                # 到点的定期维护从当前时刻重新计时 (超时不连续补跑)，提前唤醒不影响原节拍
+                if time.monotonic_ns() >= next_ns:
+                    next_ns = time.monotonic_ns() + SCAN_INTERVAL_NS
+                await self.maintain()
+
         except KeyboardInterrupt:
             logger.info("")
             logger.info("👋 机器人已停止")
             if telegram.enabled:
                 await telegram.send_message("🛑 自动交易机器人已停止")
         finally:
-            if self.exchange:
-                await self.exchange.close()
+            self.stream.stop()
+            for task in (stream_task, status_task, refresh_task, keepalive_task, self._entry_task):
+                if task and not task.done():
+                    task.cancel()
+            await telegram.close()
+            opportunity_log.close()
+            await close_exchanges()
+
+    async def maintain(self):
+        """
+        定期维护: 持仓对账、风控离场、费率收入记录
+        """
+        try:
+            async with self._trade_lock:
+                # 本轮维护共用一份持仓快照
+                positions = tuple(self.executor.positions.items())
+                # 先验证持仓一致性
+                await self.verify_and_fix_positions(positions)
+                # 监控现有持仓风险 (费率来自推送缓存)
+                await self.monitor_risks(positions)
+        except Exception as e:
+            logger.error(f"❌ 维护异常: {e}")
+            if telegram.enabled:
+                await telegram.send_message(f"⚠️ 维护异常:\n{str(e)[:200]}")
+
+        await self.check_funding_income()
+
+        # 重新评估仍高于阈值的交易对 (平仓释放资金后可能出现新空位)
+        self._schedule_entries([
+            r.symbol for r in self.scanner.get_top_rates(10)
+            if abs(r.rate) >= MIN_RATE_THRESHOLD
+        ])
+
+    def on_rates(self, ticks: list[RateTick]) -> None:
+        """
+        行情推送回调: 更新费率缓存，费率上穿开仓阈值时触发开仓评估
+        全市场每秒一批，阈值比较只用整数；仅对持仓和阈值附近的交易对构造 Decimal 费率
+        """
+        cfg = CFG
+        min_ticks = cfg.min_rate_ticks
+        reversal_ticks = cfg.reversal_ticks
+        last_ticks = self._rate_ticks
+        positions = self.executor.positions
+        
+        crossed = []
+        for tick in ticks:
+            symbol = tick.symbol
+            above = abs(tick.ticks) >= min_ticks
+            prev = last_ticks.get(symbol)
+            last_ticks[symbol] = tick.ticks
+            
+            if prev is None:
+                # 首次推送，与启动扫描的缓存比较
+                cached = self.scanner.get_cached_rate(symbol)
+                prev_above = cached is not None and abs(cached.rate) >= cfg.min_rate_threshold
+            else:
+                prev_above = abs(prev) >= min_ticks
+            
+            position = positions.get(symbol)
+            held = position is not None
+            if held and prev is not None:
+                # 费率越过反转阈值进入持仓不利一侧 (空合约收正费率，多合约收负费率) 时唤醒维护循环执行风控；
+                # 0 附近的小幅波动不算反转，同一交易对按 WAKE_DEBOUNCE 去抖
+                sign = -1 if position.perp_qty < 0 else 1
+                if sign * tick.ticks > reversal_ticks and sign * prev <= reversal_ticks:
+                    now = time.monotonic()
+                    if now - self._last_wake.get(symbol, -WAKE_DEBOUNCE) >= WAKE_DEBOUNCE:
+                        self._last_wake[symbol] = now
+                        self._wake.set()
+            # 低于阈值且未持仓的交易对缓存值不再被使用，跳过转换
+            if held or above or prev_above:
+                self.scanner.update_rate(tick.to_funding_rate())
+            
+            if above and not prev_above and not held:
+                crossed.append(symbol)
+
+        if crossed:
+            logger.info(f"⚡ 费率上穿阈值: {', '.join(crossed[:5])}{' ...' if len(crossed) > 5 else ''}")
+            self._schedule_entries(crossed)
+
+    def _schedule_entries(self, symbols: list[str]) -> None:
+        """加入待评估队列，保证同一时间只有一个评估任务在运行"""
+        if not symbols:
+            return
+        self._pending_entries.update(symbols)
+        if self._entry_task is None or self._entry_task.done():
+            self._entry_task = asyncio.create_task(self.trade_on_signal())
+
+    async def trade_on_signal(self):
+        """
+        评估推送触发的候选交易对并开仓
+        只对触发的交易对请求深度快照，REST 主要用于下单
+        """
+        while self._pending_entries:
+            symbols = self._pending_entries
+            self._pending_entries = set()
+
+            cfg = CFG
+            try:
+                spot_markets = self.exchange.spot.markets or {}
+                targets = []
+                for symbol in symbols:
+                    if symbol in self.executor.positions:
+                        continue
+
+                    # 现货必须存在才能对冲
+                    base = symbol.split("/")[0]
+                    if f"{base}/USDT" not in spot_markets:
+                        continue
+
+                    # 用推送的最优挂单预筛价差，避免无谓的深度请求
+                    spread = self.scanner.get_cached_spread(symbol)
+                    if spread is not None and spread > cfg.max_spread:
+                        continue
+
+                    targets.append(symbol)
+
+                # 并发拉取快照，单个交易对超时只跳过本轮，不拖住整批评估
+                results = await asyncio.gather(*(self._scan_with_timeout(s) for s in targets))
+                pools = [pool for pool in results if pool]
+
+                if not pools:
+                    continue
+
+                candidates = self.scanner.selector.filter(pools)
+                opportunity_log.record(candidates, "signal")
+                if candidates:
+                    async with self._trade_lock:
+                        await self.trade_candidates(candidates)
+
+            except Exception as e:
+                logger.error(f"❌ 推送触发开仓异常: {e}")
+                if telegram.enabled:
+                    await telegram.send_message(f"⚠️ 推送触发开仓异常:\n{str(e)[:200]}", wait=False)
+    
+    async def _scan_with_timeout(self, symbol: str):
+        """带超时的单交易对快照，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self.scanner.scan_single(symbol), SIGNAL_FETCH_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ {symbol} 快照超时 ({SIGNAL_FETCH_TIMEOUT}s)，本轮跳过")
+            return None
     
     async def calculate_dynamic_capacity(self) -> int:
         """
         根据资金计算动态最大持仓数量 (自动仓位管理)
         """
-        spot_bal = await self.exchange.get_spot_balance("USDT")
-        perp_bal = await self.exchange.get_perp_balance("USDT")
+        spot_bal, perp_bal = await self._snapshot.get_free("USDT")
         
         # 1. 现货能力：全额购买
         # 预留 1% 作为摩擦成本
-        spot_capacity = int((spot_bal * Decimal("0.99")) // POSITION_SIZE)
+        spot_capacity = int((spot_bal * SPOT_FEE_RESERVE) // POSITION_SIZE)
         
         # 2. 合约能力：作为保证金
         # 假设杠杆 2x (LEVERAGE defined globally or defaulted to 2)
         # 安全系数 2.0 (即保留 1倍的缓冲: 2x杠杆只需要50%保证金，但我们按100%准备，相当于1x的安全性)
         # 这样即使币价翻倍也不会爆仓 -> 极其安全
         leverage = 2
-        safety_ratio = Decimal("2.0") 
+        safety_ratio = MARGIN_SAFETY_RATIO
         margin_per_position = (POSITION_SIZE / leverage) * safety_ratio
         
         # 实际上 margin_per_position = POSITION_SIZE. 也就是1:1准备保证金。
@@ -481,38 +928,45 @@ class AutoTrader:
         # 至少允许开一个(如果余额刚够的话)，但不能是负数
         return max(0, max_pos)
 
-    async def verify_and_fix_positions(self):
+    async def verify_and_fix_positions(self, positions: tuple | None = None):
         """
         验证持仓一致性并自动修复
         检查每个托管持仓是否在交易所端都有匹配的现货和合约
+        
+        Args:
+            positions: 本轮维护的持仓快照 ((symbol, position), ...)，默认取当前持仓
         """
-        if not self.executor.positions:
+        if positions is None:
+            positions = tuple(self.executor.positions.items())
+        if not positions:
             return
             
         logger.info("  🔍 验证持仓一致性...")
         
         try:
-            # 获取交易所实际数据
-            perp_positions = await self.exchange.perp.fetch_positions()
-            perp_map = {p['symbol']: p for p in perp_positions}
-            spot_balances = await self.exchange.spot.fetch_balance()
+            # 并发获取交易所实际数据
+            perp_views, spot_balances = await asyncio.gather(
+                self._snapshot.get_perp_views(),
+                self._snapshot.get_spot_balance(),
+            )
             
             from src.strategy.executor import _get_position_store
             
             issues_found = []
+            repair_symbols = []
+            repairs = []
             
-            for symbol, pos in list(self.executor.positions.items()):
+            for symbol, pos in positions:
                 base = pos.base_currency
                 
                 # 检查合约端
-                perp_data = perp_map.get(symbol)
-                perp_amt = Decimal(str(perp_data['info']['positionAmt'])) if perp_data else Decimal(0)
-                has_perp = abs(perp_amt) > Decimal("0.001")
+                view = perp_views.get(symbol)
+                perp_amt = view.amt if view else ZERO
+                has_perp = abs(perp_amt) > MIN_PERP_QTY
                 
                 # 检查现货端
-                spot_free = Decimal(str(spot_balances.get(base, {}).get('free', 0)))
-                spot_total = Decimal(str(spot_balances.get(base, {}).get('total', 0)))
-                has_spot = spot_total >= pos.spot_qty * Decimal("0.9")
+                spot_total = _D(spot_balances.get(base, {}).get('total', 0))
+                has_spot = spot_total >= pos.spot_qty * SPOT_HEDGE_TOLERANCE
                 
                 if has_perp and has_spot:
                     continue  # 正常
@@ -522,39 +976,24 @@ class AutoTrader:
                 issues_found.append(issue)
                 logger.warning(f"  ⚠️ 持仓不一致: {issue}")
                 
-                # 自动修复
-                try:
-                    if has_perp and not has_spot:
-                        # 有合约没现货 -> 平掉合约
-                        logger.info(f"    🔧 正在平掉孤立合约 {symbol}...")
-                        await self.exchange.place_perp_order(
-                            symbol=symbol,
-                            side=OrderSide.BUY if perp_amt < 0 else OrderSide.SELL,
-                            amount=abs(perp_amt),
-                            order_type=OrderType.MARKET,
-                        )
-                        logger.info(f"    ✅ 合约已平仓")
-                        
-                    elif has_spot and not has_perp:
-                        # 有现货没合约 -> 卖掉现货
-                        logger.info(f"    🔧 正在卖出孤立现货 {base}...")
-                        spot_symbol = f"{base}/USDT"
-                        await self.exchange.place_spot_order(
-                            symbol=spot_symbol,
-                            side=OrderSide.SELL,
-                            amount=spot_total,
-                            order_type=OrderType.MARKET,
-                        )
-                        logger.info(f"    ✅ 现货已卖出")
+                # 自动修复 (各交易对互不相关，先收集后并发下单)
+                repair_symbols.append(symbol)
+                repairs.append(self._repair_position(symbol, base, perp_amt if has_perp else None, spot_total if has_spot else None))
+            
+            if repairs:
+                results = await asyncio.gather(*repairs, return_exceptions=True)
+                self._snapshot.invalidate()
+                
+                for symbol, result in zip(repair_symbols, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"    ❌ 修复失败 {symbol}: {result}")
+                        continue
                     
                     # 从本地记录中删除
-                    del self.executor.positions[symbol]
-                    _get_position_store().delete(symbol)
+                    self.executor.positions.pop(symbol, None)
+                    _get_position_store().remove(symbol)
                     logger.info(f"    ✅ 已从本地记录中移除 {symbol}")
                     
-                except Exception as fix_err:
-                    logger.error(f"    ❌ 修复失败: {fix_err}")
-                    
             if issues_found:
                 # 发送告警
                 if telegram.enabled:
@@ -562,86 +1001,123 @@ class AutoTrader:
                         f"🚨 <b>持仓异常自动修复</b>\n\n"
                         f"发现 {len(issues_found)} 个不一致持仓:\n"
                         + "\n".join(f"  • {i}" for i in issues_found)
-                        + "\n\n已尝试自动处理，请检查账户。"
+                        + "\n\n已尝试自动处理，请检查账户。",
+                        wait=False,
                     )
                     
         except Exception as e:
             logger.error(f"验证持仓失败: {e}")
 
-    async def scan_and_trade(self):
-        """扫描并自动交易"""
-        try:
-            # 先验证持仓一致性
-            await self.verify_and_fix_positions()
+    async def _repair_position(
+        self,
+        symbol: str,
+        base: str,
+        perp_amt: Decimal | None,
+        spot_total: Decimal | None,
+    ) -> None:
+        """
+        处理单边持仓: 只有合约时平掉合约，只有现货时卖出现货
+        
+        Args:
+            perp_amt: 孤立合约数量，无孤立合约为 None
+            spot_total: 孤立现货数量，无孤立现货为 None
+        """
+        if perp_amt is not None:
+            # 有合约没现货 -> 平掉合约
+            logger.info(f"    🔧 正在平掉孤立合约 {symbol}...")
+            await self.exchange.place_perp_order(
+                symbol=symbol,
+                side=OrderSide.BUY if perp_amt < 0 else OrderSide.SELL,
+                amount=abs(perp_amt),
+                order_type=OrderType.MARKET,
+            )
+            logger.info(f"    ✅ 合约已平仓 {symbol}")
             
-            # 监控现有持仓风险
-            await self.monitor_risks()
+        elif spot_total is not None:
+            # 有现货没合约 -> 卖掉现货
+            logger.info(f"    🔧 正在卖出孤立现货 {base}...")
+            await self.exchange.place_spot_order(
+                symbol=f"{base}/USDT",
+                side=OrderSide.SELL,
+                amount=spot_total,
+                order_type=OrderType.MARKET,
+            )
+            logger.info(f"    ✅ 现货已卖出 {base}")
 
+    async def scan_and_trade(self):
+        """全市场 REST 扫描并自动交易 (启动时执行一次，初始化费率/行情缓存)"""
+        try:
             logger.info(f"🔄 扫描市场... ({datetime.now().strftime('%H:%M:%S')})")
             
-            # 计算动态持仓能力
-            max_dynamic_positions = await self.calculate_dynamic_capacity()
-            current_positions = len(self.executor.positions)
-            
-            logger.info(f"  当前持仓: {current_positions}/{max_dynamic_positions} (自动仓位管理)")
-            
-            if current_positions >= max_dynamic_positions: 
-                logger.info(f"  ⚠️  已达当前资金支持的最大持仓 ({max_dynamic_positions})")
-                # 即使满仓也扫描市场寻找更好机会 (轮动逻辑保持不变)
-                pools = await self.scanner.scan()
-                if pools:
-                    # 筛选高质量池子作为候选
-                    candidates = [
-                        p for p in pools 
-                        if abs(p.funding_rate) >= MIN_RATE_THRESHOLD
-                        and p.depth_05pct >= MIN_DEPTH
-                        and p.symbol not in self.executor.positions
-                        and (not config.allow_negative_rates and p.funding_rate < 0) == False
-                    ]
-                    candidates.sort(key=lambda x: abs(x.funding_rate), reverse=True)
-                    
-                    if candidates:
-                        await self.optimize_positions(candidates)
-                return
-            
-            # 扫描市场
             pools = await self.scanner.scan()
+            opportunity_log.record(pools, "scan")
             
-            if not pools:
-                logger.info("  未发现符合条件的机会")
-                return
-            
-            # 筛选高费率机会
-            opportunities = [
-                p for p in pools
-                if abs(p.funding_rate) >= MIN_RATE_THRESHOLD
-                and p.depth_05pct >= MIN_DEPTH
-                and p.spread <= MAX_SPREAD
-                and p.symbol not in self.executor.positions  # 避免重复开仓
-            ]
-            
-            if not opportunities:
-                logger.info(f"  扫描 {len(pools)} 个池子，无超过阈值的机会")
-                return
-            
-            # 按费率排序，选择最高的
-            opportunities.sort(key=lambda x: abs(x.funding_rate), reverse=True)
-            best = opportunities[0]
-            
-            logger.info(f"  🎯 发现高费率机会: {best.symbol}")
-            logger.info(f"     费率: {format_rate(best.funding_rate)}")
-            logger.info(f"     深度: {format_usdt(best.depth_05pct)}")
-            logger.info(f"     价差: {best.spread:.4%}")
-            logger.info("")
-            
-            # 执行开仓
-            await self.open_position(best)
+            async with self._trade_lock:
+                await self.trade_candidates(pools)
         
         except Exception as e:
             logger.error(f"❌ 扫描异常: {e}")
             if telegram.enabled:
                 await telegram.send_message(f"⚠️ 扫描异常:\n{str(e)[:200]}")
     
+    async def trade_candidates(self, pools: list):
+        """按开仓条件筛选候选池，未满仓则开仓，满仓则尝试轮动"""
+        cfg = CFG
+        
+        # 计算动态持仓能力
+        max_dynamic_positions = await self.calculate_dynamic_capacity()
+        current_positions = len(self.executor.positions)
+        
+        logger.info(f"  当前持仓: {current_positions}/{max_dynamic_positions} (自动仓位管理)")
+        
+        if current_positions >= max_dynamic_positions: 
+            logger.info(f"  ⚠️  已达当前资金支持的最大持仓 ({max_dynamic_positions})")
+            # 即使满仓也评估更好机会 (轮动逻辑保持不变)
+            if pools:
+                # 筛选高质量池子作为候选
+                candidates = [
+                    p for p in pools 
+                    if abs(p.funding_rate) >= cfg.min_rate_threshold
+                    and p.depth_05pct >= cfg.min_depth
+                    and p.symbol not in self.executor.positions
+                    and (not config.allow_negative_rates and p.funding_rate < 0) == False
+                ]
+                candidates.sort(key=lambda x: abs(x.funding_rate), reverse=True)
+                
+                if candidates:
+                    await self.optimize_positions(candidates)
+            return
+        
+        if not pools:
+            logger.info("  未发现符合条件的机会")
+            return
+        
+        # 筛选高费率机会
+        opportunities = [
+            p for p in pools
+            if abs(p.funding_rate) >= cfg.min_rate_threshold
+            and p.depth_05pct >= cfg.min_depth
+            and p.spread <= cfg.max_spread
+            and p.symbol not in self.executor.positions  # 避免重复开仓
+        ]
+        
+        if not opportunities:
+            logger.info(f"  评估 {len(pools)} 个池子，无超过阈值的机会")
+            return
+        
+        # 按费率排序，选择最高的
+        opportunities.sort(key=lambda x: abs(x.funding_rate), reverse=True)
+        best = opportunities[0]
+        
+        logger.info(f"  🎯 发现高费率机会: {best.symbol}")
+        logger.info(f"     费率: {format_rate(best.funding_rate)}")
+        logger.info(f"     深度: {format_usdt(best.depth_05pct)}")
+        logger.info(f"     价差: {best.spread:.4%}")
+        logger.info("")
+        
+        # 执行开仓
+        await self.open_position(best)
+    
     async def optimize_positions(self, market_opportunities: list):
         """
         持仓优化 (资金轮动)
@@ -666,7 +1142,7 @@ class AutoTrader:
         min_profit_threshold = Decimal(str(config.rotation_config.get("min_profit_threshold", 0)))
         
         # 2. 遍历现有持仓
-        for symbol, position in list(self.executor.positions.items()):
+        for symbol, position in tuple(self.executor.positions.items()):
             # 获取当前持仓的最新费率
             current_rate_info = self.scanner.get_cached_rate(symbol)
             if not current_rate_info:
@@ -693,14 +1169,19 @@ class AutoTrader:
                 
                 # 平掉旧仓位
                 close_pnl = await self.executor.close_arbitrage(symbol)
+                self._snapshot.invalidate()
                 
                 if close_pnl is not None:
                     if telegram.enabled:
                         await telegram.send_message(
-                            f"🔄 <b>执行资金轮动</b>\n\n"
-                            f"卖出: {symbol} (盈亏 {format_usdt(close_pnl)})\n"
-                            f"买入: {best_new_opportunity.symbol} (费率 {format_rate(new_rate)})\n"
-                            f"原因: 费率提升 {format_rate(new_rate - current_rate)}"
+                            _ROTATE_TMPL.format(
+                                old_symbol=symbol,
+                                pnl=format_usdt(close_pnl),
+                                new_symbol=best_new_opportunity.symbol,
+                                new_rate=format_rate(new_rate),
+                                rate_gain=format_rate(new_rate - current_rate),
+                            ),
+                            wait=False,
                         )
                     
                     # 立即开新仓
@@ -711,13 +1192,18 @@ class AutoTrader:
             else:
                 logger.info(f"     ❌ 未满足最低盈利要求 ({format_usdt(min_profit_threshold)})，放弃轮动")
 
-    async def monitor_risks(self):
+    async def monitor_risks(self, positions: tuple | None = None):
         """
         监控持仓风险
         1. 费率过低离场
         2. 风险指标触发离场 (费率反转/保证金不足)
+        
+        Args:
+            positions: 本轮维护的持仓快照 ((symbol, position), ...)，默认取当前持仓
         """
-        if not self.executor.positions:
+        if positions is None:
+            positions = tuple(self.executor.positions.items())
+        if not positions:
             return
 
         logger.info("🔍 监控持仓风险...")
@@ -725,13 +1211,14 @@ class AutoTrader:
         # 需要平仓的列表
         to_close = []
         
-        for symbol, position in self.executor.positions.items():
-            # 获取最新费率
-            rate_info = self.scanner.get_cached_rate(symbol)
+        held = self.executor.positions
+        for symbol, position in positions:
+            # 对账阶段已移除的持仓跳过
+            if symbol not in held:
+                continue
             
-            # 如果缓存没有，尝试重新获取（可选）
-            if not rate_info:
-                rate_info = await self.exchange.get_funding_rate(symbol)
+            # 获取最新费率
+            rate_info = await self._get_rate(symbol)
             
             current_rate = rate_info.rate
             
@@ -759,36 +1246,38 @@ class AutoTrader:
             logger.info(f"⛔ 正在执行平仓: {symbol} ({reason})")
             
             pnl = await self.executor.close_arbitrage(symbol)
+            self._snapshot.invalidate()
             
             if pnl is not None:
                 if telegram.enabled:
                     await telegram.send_message(
-                        f"👋 <b>自动平仓通知</b>\n\n"
-                        f"交易对: {symbol}\n"
-                        f"原因: {reason}\n"
-                        f"最终盈亏: <code>${pnl:.2f}</code>"
+                        _AUTO_CLOSE_TMPL.format(symbol=symbol, reason=reason, pnl=float(pnl)),
+                        wait=False,
                     )
 
     
     async def can_open_position(self) -> bool:
         """
         检查账户资金是否支持开新仓
+        
+        余额来自账户快照 (现货/合约并发请求，SNAPSHOT_TTL 内复用)，
+        同一轮连续评估多个池子只请求一次；开仓后快照失效，下一次检查读取新余额
         """
+        cfg = CFG
         try:
-            # 获取余额
-            spot_free = await self.exchange.get_spot_balance("USDT")
-            perp_free = await self.exchange.get_perp_balance("USDT")
+            # 获取余额 (快照缓存)
+            spot_free, perp_free = await self._snapshot.get_free("USDT")
             
             # 1. 检查现货余额 (需要全额)
-            if spot_free < POSITION_SIZE:
-                msg = f"现货余额不足: ${spot_free:.2f} < ${POSITION_SIZE}"
+            if spot_free < cfg.position_size:
+                msg = f"现货余额不足: ${spot_free:.2f} < ${cfg.position_size}"
                 logger.warning(f"⚠️ 无法开仓: {msg}")
                 # if telegram.enabled:
                 #    await telegram.send_message(f"⚠️ <b>无法开仓</b>\nReason: {msg}")
                 return False
             
             # 2. 检查合约余额 (假设 2x 杠杆，需要 SIZE/2，预留一些 buffer 0.6)
-            required_perp = POSITION_SIZE * Decimal("0.6")
+            required_perp = cfg.required_perp
             if perp_free < required_perp:
                 msg = f"合约余额不足: ${perp_free:.2f} < ${required_perp:.2f}"
                 logger.warning(f"⚠️ 无法开仓: {msg}")
@@ -813,6 +1302,7 @@ class AutoTrader:
             
             # 执行开仓
             position = await self.executor.open_arbitrage(pool, POSITION_SIZE)
+            self._snapshot.invalidate()
             
             if position:
                 logger.info(f"✅ 开仓成功!")
@@ -820,8 +1310,9 @@ class AutoTrader:
                 logger.info(f"   合约: {position.perp_qty:.6f} @ ${position.perp_avg_price:.4f}")
                 logger.info(f"   Delta: {position.delta:.6f}")
                 
-                # 发送 Telegram 通知
+                # 发送 Telegram 通知 (成交与机会详情合并为一条消息)
                 if telegram.enabled:
+                    daily_income = float(POSITION_SIZE) * pool.abs_rate * 3
                     await telegram.notify_trade(
                         action="开仓",
                         symbol=pool.symbol,
@@ -829,38 +1320,55 @@ class AutoTrader:
                         spot_price=position.spot_avg_price,
                         perp_qty=position.perp_qty,
                         perp_price=position.perp_avg_price,
-                    )
-                    
-                    # 额外发送机会详情
-                    daily_income = POSITION_SIZE * abs(pool.funding_rate) * 3
-                    await telegram.send_message(
-                        f"📊 <b>开仓详情</b>\n\n"
-                        f"费率: <code>{pool.funding_rate*100:+.4f}%</code>\n"
-                        f"预计日收益: <code>${daily_income:.2f}</code>\n"
-                        f"深度: <code>${pool.depth_05pct:.0f}</code>\n"
-                        f"价差: <code>{pool.spread:.4%}</code>"
+                        details=_OPEN_DETAIL_TMPL.format(
+                            rate_pct=float(pool.funding_rate) * 100,
+                            income=daily_income,
+                            depth=float(pool.depth_05pct),
+                            spread=float(pool.spread),
+                        ),
+                        wait=False,
                     )
             else:
                 logger.error(f"❌ 开仓失败: {pool.symbol}")
                 if telegram.enabled:
                     await telegram.send_message(
-                        f"❌ 开仓失败\n\n"
-                        f"交易对: {pool.symbol}\n"
-                        f"费率: {pool.funding_rate*100:+.4f}%"
+                        _OPEN_FAILED_TMPL.format(
+                            symbol=pool.symbol, rate_pct=float(pool.funding_rate) * 100,
+                        ),
+                        wait=False,
                     )
         
         except Exception as e:
             logger.error(f"❌ 开仓异常: {e}")
             if telegram.enabled:
                 await telegram.send_message(
-                    f"⚠️ 开仓异常\n\n"
-                    f"交易对: {pool.symbol}\n"
-                    f"错误: {str(e)[:200]}"
+                    _OPEN_ERROR_TMPL.format(symbol=pool.symbol, error=str(e)[:200]),
+                    wait=False,
                 )
 
 
+def apply_process_scheduling():
+    """按配置绑定 CPU 核心并调整优先级 (不支持的平台或权限不足时跳过)"""
+    cpus = config.get("execution.cpu_affinity") or []
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, set(cpus))
+            logger.info(f"进程已绑定 CPU: {sorted(cpus)}")
+        except OSError as e:
+            logger.warning(f"绑定 CPU 失败: {e}")
+    
+    niceness = config.get("execution.nice", 0)
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+            logger.info(f"进程优先级已调整: nice {niceness:+d}")
+        except OSError as e:
+            logger.warning(f"调整进程优先级失败 (需要 root 或 CAP_SYS_NICE): {e}")
+
+
 async def main():
     setup_logger()
+    apply_process_scheduling()
     
     # 确认启动
     print("=" * 70)
@@ -869,20 +1377,33 @@ async def main():
     print(f"费率阈值: {MIN_RATE_THRESHOLD*100:.2f}% (超过此值自动开仓)")
     print(f"单笔仓位: ${POSITION_SIZE}")
     print(f"最大持仓: {MAX_POSITIONS} 个")
-    print(f"扫描间隔: {SCAN_INTERVAL} 秒")
+    print(f"开仓触发: 行情推送 (费率上穿阈值)")
+    print(f"维护间隔: {SCAN_INTERVAL} 秒")
     print()
     print("机器人将使用真实资金自动交易!")
     print("=" * 70)
     print()
     
-    confirm = input("确认启动? (输入 YES 继续): ")
+    # 等待确认期间后台预加载市场信息 (共享实例，start() 中直接命中缓存)；
+    # input 放到线程中执行，不阻塞事件循环
+    warmup_task = asyncio.create_task(warmup(get_exchange("binance", testnet=False)))
+    
+    confirm = await asyncio.to_thread(input, "确认启动? (输入 YES 继续): ")
     if confirm != "YES":
         print("❌ 已取消")
+        warmup_task.cancel()
+        await close_exchanges()
         return
     
+    try:
+        await warmup_task
+    except Exception as e:
+        logger.warning(f"预加载市场信息失败: {e}")
+    
     trader = AutoTrader()
     await trader.start()
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
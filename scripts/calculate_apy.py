@@ -1,7 +1,9 @@
 """
 年化收益率计算
-基于 0.5% 费率阈值
+基于 0.5% 费率阈值，并对 费率 × 持仓天数 × 资金规模 做网格测算
 """
+import numpy as np
+import pandas as pd
 
 # ==================== 参数设置 ====================
 FUNDING_RATE = 0.005  # 0.5% 每 8 小时
@@ -9,51 +11,143 @@ POSITION_SIZE = 60    # 总资金 (USDT)
 HOLDING_DAYS = 7      # 平均持仓天数
 TRADE_FREQUENCY = 12  # 一年交易次数
 
+# 网格测算参数
+FUNDING_RATES = np.linspace(0.001, 0.01, 50)    # 费率 0.1% ~ 1%
+HOLDING_DAYS_GRID = np.arange(1, 30)            # 持仓 1 ~ 29 天
+POSITION_SIZES = np.array([60, 100, 500, 1000])  # 资金规模 (USDT)
+
+PERIODS_PER_DAY = 3   # 每天 3 次结算
+SPOT_FEE = 0.001      # 现货买卖 0.1%
+FUTURES_FEE = 0.0004  # 合约开平 0.04%
+
+# 表格展示的持仓天数
+DISPLAY_DAYS = [1, 3, 7, 14, 21, 29]
+
+
 # ==================== 收益计算 ====================
 
-# 1. 单笔交易收益
-periods_per_day = 3  # 每天 3 次结算
-total_periods = HOLDING_DAYS * periods_per_day
-funding_income = POSITION_SIZE * FUNDING_RATE * total_periods
-
-# 2. 交易成本
-spot_fee = POSITION_SIZE * 0.5 * 0.001  # 现货买卖 0.1%
-futures_fee = POSITION_SIZE * 0.5 * 0.0004 * 2  # 合约开平 0.04%
-total_fee = spot_fee + futures_fee
-
-# 3. 净收益
-net_profit = funding_income - total_fee
-roi_per_trade = net_profit / POSITION_SIZE
-
-# 4. 年化收益
-annual_profit = net_profit * TRADE_FREQUENCY
-annual_roi = (annual_profit / POSITION_SIZE) * 100
-
-print("=" * 60)
-print("📊 资金费率套利年化收益测算 (0.5% 阈值)")
-print("=" * 60)
-print()
-print(f"假设条件:")
-print(f"  费率阈值: {FUNDING_RATE*100:.2f}% (每 8 小时)")
-print(f"  总资金: ${POSITION_SIZE}")
-print(f"  平均持仓: {HOLDING_DAYS} 天")
-print(f"  年交易次数: {TRADE_FREQUENCY} 次")
-print()
-print("-" * 60)
-print("单笔交易收益:")
-print(f"  资金费收入: ${funding_income:.2f} ({total_periods} 个周期)")
-print(f"  交易手续费: ${total_fee:.2f}")
-print(f"  净收益: ${net_profit:.2f}")
-print(f"  单次回报率: {roi_per_trade*100:.2f}%")
-print()
-print("-" * 60)
-print(f"年化收益率: {annual_roi:.1f}% APY")
-print(f"年预期利润: ${annual_profit:.2f}")
-print("=" * 60)
-print()
-print("⚠️  注意:")
-print("  1. 实际收益受市场波动影响")
-print("  2. 费率可能随时反转")
-print("  3. 此为理想状态测算")
-print("  4. 保守预估: 20-40% APY")
-print("=" * 60)
+def compute_grid(
+    funding_rates: np.ndarray,
+    holding_days: np.ndarray,
+    position_sizes: np.ndarray,
+    trade_frequency: int = TRADE_FREQUENCY,
+) -> dict[str, np.ndarray]:
+    """
+    广播计算收益网格 (无 Python 循环)
+
+    Args:
+        funding_rates: 费率 (每 8 小时)
+        holding_days: 平均持仓天数
+        position_sizes: 总资金 (USDT)
+        trade_frequency: 一年交易次数
+
+    Returns:
+        各指标数组，形状 (资金规模, 费率, 持仓天数)
+    """
+    size = np.asarray(position_sizes, dtype=float)[:, None, None]
+    rate = np.asarray(funding_rates, dtype=float)[None, :, None]
+    periods = np.asarray(holding_days)[None, None, :] * PERIODS_PER_DAY
+
+    # 1. 单笔交易收益
+    funding_income = size * rate * periods
+
+    # 2. 交易成本 (只与资金规模有关)
+    spot_fee = size * 0.5 * SPOT_FEE
+    futures_fee = size * 0.5 * FUTURES_FEE * 2
+    total_fee = spot_fee + futures_fee
+
+    # 3. 净收益
+    net_profit = funding_income - total_fee
+
+    # 4. 年化收益
+    annual_profit = net_profit * trade_frequency
+    annual_roi = annual_profit / size
+
+    return {
+        "funding_income": funding_income,
+        "total_fee": np.broadcast_to(total_fee, funding_income.shape),
+        "net_profit": net_profit,
+        "roi_per_trade": net_profit / size,
+        "annual_profit": annual_profit,
+        "annual_roi": annual_roi,
+    }
+
+
+def roi_table(annual_roi: np.ndarray, size_index: int = 0) -> pd.DataFrame:
+    """取某一资金规模的切片，行=费率，列=持仓天数 (APY %)"""
+    days = HOLDING_DAYS_GRID
+    columns = np.searchsorted(days, DISPLAY_DAYS)
+    return pd.DataFrame(
+        annual_roi[size_index][::7][:, columns] * 100,
+        index=pd.Index([f"{r:.2%}" for r in FUNDING_RATES[::7]], name="费率"),
+        columns=pd.Index([f"{d}天" for d in days[columns]], name="持仓"),
+    )
+
+
+def profit_table(annual_profit: np.ndarray, holding_days: int = HOLDING_DAYS) -> pd.DataFrame:
+    """取某一持仓天数的切片，行=费率，列=资金规模 (年预期利润 USDT)"""
+    day_index = int(np.searchsorted(HOLDING_DAYS_GRID, holding_days))
+    return pd.DataFrame(
+        annual_profit[:, ::7, day_index].T,
+        index=pd.Index([f"{r:.2%}" for r in FUNDING_RATES[::7]], name="费率"),
+        columns=pd.Index([f"${s}" for s in POSITION_SIZES], name="资金"),
+    )
+
+
+def main():
+    # 基准场景 (单点也走同一套广播计算)
+    base = {k: v.item() for k, v in compute_grid(
+        np.array([FUNDING_RATE]), np.array([HOLDING_DAYS]), np.array([POSITION_SIZE]),
+    ).items()}
+    total_periods = HOLDING_DAYS * PERIODS_PER_DAY
+
+    print("=" * 60)
+    print("📊 资金费率套利年化收益测算 (0.5% 阈值)")
+    print("=" * 60)
+    print()
+    print(f"假设条件:")
+    print(f"  费率阈值: {FUNDING_RATE*100:.2f}% (每 8 小时)")
+    print(f"  总资金: ${POSITION_SIZE}")
+    print(f"  平均持仓: {HOLDING_DAYS} 天")
+    print(f"  年交易次数: {TRADE_FREQUENCY} 次")
+    print()
+    print("-" * 60)
+    print("单笔交易收益:")
+    print(f"  资金费收入: ${base['funding_income']:.2f} ({total_periods} 个周期)")
+    print(f"  交易手续费: ${base['total_fee']:.2f}")
+    print(f"  净收益: ${base['net_profit']:.2f}")
+    print(f"  单次回报率: {base['roi_per_trade']*100:.2f}%")
+    print()
+    print("-" * 60)
+    print(f"年化收益率: {base['annual_roi']*100:.1f}% APY")
+    print(f"年预期利润: ${base['annual_profit']:.2f}")
+    print("=" * 60)
+
+    # 网格测算
+    grid = compute_grid(FUNDING_RATES, HOLDING_DAYS_GRID, POSITION_SIZES)
+    annual_roi = grid["annual_roi"]
+    print()
+    print(f"📐 网格测算: {annual_roi.size} 组参数 "
+          f"({len(POSITION_SIZES)} 资金 × {len(FUNDING_RATES)} 费率 × {len(HOLDING_DAYS_GRID)} 天)")
+
+    with pd.option_context("display.float_format", "{:,.1f}".format, "display.width", 120):
+        # 手续费与资金规模成正比，年化收益率与资金规模无关，只展示一张
+        print()
+        print("年化收益率 (% APY):")
+        print(roi_table(annual_roi).to_string())
+        print()
+        print(f"年预期利润 (USDT, 持仓 {HOLDING_DAYS} 天):")
+        print(profit_table(grid["annual_profit"]).to_string())
+
+    print("=" * 60)
+    print()
+    print("⚠️  注意:")
+    print("  1. 实际收益受市场波动影响")
+    print("  2. 费率可能随时反转")
+    print("  3. 此为理想状态测算")
+    print("  4. 保守预估: 20-40% APY")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
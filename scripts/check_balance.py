@@ -8,7 +8,7 @@ from decimal import Decimal
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
-from src.exchange import create_exchange
+from src.exchange import create_exchange, warmup
 from src.utils import logger, setup_logger, format_usdt
 
 async def main():
@@ -17,42 +17,51 @@ async def main():
     exchange = create_exchange("binance", testnet=False)
     
     try:
+        # Load spot + perp markets once up front instead of on the first call
+        await warmup(exchange)
+        
         print("\n=== Account Balance Check ===")
         
+        # 1-3. Spot balance, perp balance and positions are independent: fetch concurrently
+        spot_usdt, perp_usdt, positions = await asyncio.gather(
+            exchange.get_spot_balance("USDT"),
+            exchange.get_perp_balance("USDT"),
+            exchange.perp.fetch_positions(),
+            return_exceptions=True,
+        )
+
         # 1. Check Spot Balance
-        try:
-            spot_usdt = await exchange.get_spot_balance("USDT")
+        if isinstance(spot_usdt, Exception):
+            print(f"❌ Failed to fetch Spot balance: {spot_usdt}")
+        else:
             print(f"💰 Spot Account (现货): {format_usdt(spot_usdt)}")
-        except Exception as e:
-            print(f"❌ Failed to fetch Spot balance: {e}")
 
         # 2. Check Perp Balance
-        try:
-            # Note: CCXT unified might store this differently, checking standard way first
-            perp_usdt = await exchange.get_perp_balance("USDT")
+        if isinstance(perp_usdt, Exception):
+            print(f"❌ Failed to fetch Futures balance: {perp_usdt}")
+        else:
             print(f"📈 Futures Account (合约): {format_usdt(perp_usdt)}")
-        except Exception as e:
-            print(f"❌ Failed to fetch Futures balance: {e}")
             
         # 3. Check Positions
-        try:
-            print("\n[Futures Positions]")
-            positions = await exchange.perp.fetch_positions()
-            active_positions = [p for p in positions if float(p['info']['positionAmt']) != 0]
+        print("\n[Futures Positions]")
+        if isinstance(positions, Exception):
+            print(f"❌ Failed to fetch positions: {positions}")
+        else:
+            # Parse positionAmt once while filtering
+            active_positions = [
+                (p, size) for p in positions if (size := float(p['info']['positionAmt'])) != 0.0
+            ]
             if not active_positions:
                  print("  No active positions.")
             else:
-                 for p in active_positions:
+                 for p, size in active_positions:
                      symbol = p['symbol']
-                     size = p['info']['positionAmt']
                      pnl = p['info']['unRealizedProfit']
                      print(f"  {symbol}: Size={size} PnL={pnl}")
-        except Exception as e:
-            print(f"❌ Failed to fetch positions: {e}")
 
         print("=============================")
         
-        if spot_usdt < 20:
+        if not isinstance(spot_usdt, Exception) and spot_usdt < 20:
             print("\n⚠️  Warning: Spot balance is less than $20.")
             print("   Arbitrage requires Buying Spot + Shorting Futures.")
             print("   Please transfer USDT to your [Spot Account].")
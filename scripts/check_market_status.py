@@ -1,5 +1,6 @@
 
 import asyncio
+import heapq
 import sys
 from pathlib import Path
 from decimal import Decimal
@@ -7,7 +8,7 @@ from decimal import Decimal
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
-from src.exchange import create_exchange
+from src.exchange import create_exchange, warmup
 from src.strategy.scanner import Scanner
 from src.utils import config, format_rate, format_usdt
 
@@ -16,43 +17,35 @@ async def main():
     exchange = create_exchange("binance", testnet=False)
     
     try:
+        # Load spot + perp markets once up front (spot markets are needed below)
+        await warmup(exchange)
+        
         print("Fetching rates...")
         rates = await exchange.get_funding_rates()
-        # Filter for USDT perps only
-        rates = [r for r in rates if r.symbol.endswith(":USDT")] 
         
         print(f"\n=== Searching for ANY Tradable Positive Opportunity ===")
         
-        tradable_candidates = []
-        
-        # Ensure spot markets loaded
-        if not exchange.spot.markets:
-            await exchange.spot.load_markets()
-
-        for r in rates:
-            # Skip negative rates
-            if r.rate <= 0:
-                continue
-                
-            symbol = r.symbol
-            base = symbol.split("/")[0]
-            spot_symbol = f"{base}/USDT"
-            
-            if spot_symbol in exchange.spot.markets:
-                tradable_candidates.append(r)
+        # Bases with a USDT spot market, computed once
+        spot_bases = {
+            m.partition("/")[0] for m in exchange.spot.markets if m.endswith("/USDT")
+        }
+        # Single pass: USDT perps only, skip negative rates, spot market must exist
+        tradable_candidates = [
+            r for r in rates
+            if r.rate > 0
+            and r.symbol.endswith(":USDT")
+            and r.symbol.partition("/")[0] in spot_bases
+        ]
         
         print(f"Found {len(tradable_candidates)} tradable positive pairs.")
         
-        # Sort by rate desc
-        tradable_candidates.sort(key=lambda x: x.rate, reverse=True)
-        
         print(f"\nTop 10 Tradable Positive Pairs:")
         print(f"{'Symbol':<20} {'Rate':<10} {'Spot':<10}")
         print("-" * 50)
         
-        for r in tradable_candidates[:10]:
-             base = r.symbol.split("/")[0]
-             spot_symbol = f"{base}/USDT"
+        # Top 10 by rate desc (no full sort needed)
+        for r in heapq.nlargest(10, tradable_candidates, key=lambda x: x.rate):
+             spot_symbol = f"{r.symbol.partition('/')[0]}/USDT"
              print(f"{r.symbol:<20} {format_rate(r.rate):<10} {spot_symbol:<10}")
 
     finally:
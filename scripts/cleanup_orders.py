@@ -6,7 +6,9 @@ from pathlib import Path
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
-from src.exchange import create_exchange
+from ccxt.base.errors import OrderNotFound
+
+from src.exchange import create_exchange, warmup
 from src.utils import logger, setup_logger
 
 async def main():
@@ -15,48 +17,34 @@ async def main():
     exchange = create_exchange("binance", testnet=False)
     
     try:
+        # Load spot + perp markets once up front instead of on the first cancel
+        await warmup(exchange)
+        
         print("\n=== Canceling All Open Orders ===")
         
-        # 1. Spot
-        print("\n[Spot] Checking open orders...")
-        try:
-            # cancel_all_orders isn't always supported on all pairs globally in CCXT simple call,
-            # but we can try to fetch open orders and cancel them one by one if needed.
-            # For simplicity, let's try to fetch open orders for relevant symbols if possible, 
-            # OR just use the 'cancelAllOrders' if supported. 
-            # Binance supports cancel all for a symbol. 
-            # Iterating all symbols is expensive.
-            # Let's just user CCXT's cancel_all_orders if possible, or warns.
-            
-            # Since we don't know exactly which symbol has orders, we might need to check 'USDC/USDT' specifically 
-            # as that was the one failing.
-            target_symbols = ["USDC/USDT", "GTC/USDT"] 
-            
-            for symbol in target_symbols:
-                open_orders = await exchange.spot.fetch_open_orders(symbol)
-                print(f"  {symbol}: Found {len(open_orders)} open orders.")
-                for order in open_orders:
-                    await exchange.spot.cancel_order(order['id'], symbol)
-                    print(f"    Cancelled Spot Order {order['id']}")
-                    
-        except Exception as e:
-            print(f"❌ Failed to cancel Spot orders: {e}")
-
-        # 2. Perp
-        print("\n[Futures] Checking open orders...")
-        try:
-            # Similar for perps
-            target_symbols_perp = ["USDC/USDT:USDT", "GTC/USDT:USDT"]
-            
-            for symbol in target_symbols_perp:
-                open_orders = await exchange.perp.fetch_open_orders(symbol)
-                print(f"  {symbol}: Found {len(open_orders)} open orders.")
-                for order in open_orders:
-                    await exchange.perp.cancel_order(order['id'], symbol)
-                    print(f"    Cancelled Perp Order {order['id']}")
-                    
-        except Exception as e:
-             print(f"❌ Failed to cancel Futures orders: {e}")
+        # Binance cancels every open order of a symbol in one request
+        # (spot DELETE /api/v3/openOrders, futures DELETE /fapi/v1/allOpenOrders);
+        # all symbols of both markets are cancelled concurrently.
+        # Since we don't know exactly which symbol has orders, we check the ones that were failing.
+        target_symbols = ["USDC/USDT", "GTC/USDT"]
+        target_symbols_perp = ["USDC/USDT:USDT", "GTC/USDT:USDT"]
+        
+        targets = [("Spot", exchange.spot, s) for s in target_symbols]
+        targets += [("Futures", exchange.perp, s) for s in target_symbols_perp]
+        
+        results = await asyncio.gather(
+            *(client.cancel_all_orders(symbol) for _, client, symbol in targets),
+            return_exceptions=True,
+        )
+        
+        for (market, _, symbol), result in zip(targets, results):
+            if isinstance(result, OrderNotFound):
+                # Binance spot answers -2011 when the symbol has no open orders
+                print(f"  [{market}] {symbol}: no open orders")
+            elif isinstance(result, Exception):
+                print(f"❌ [{market}] Failed to cancel {symbol} orders: {result}")
+            else:
+                print(f"  [{market}] {symbol}: cancelled all open orders")
              
         print("\nDone.")
             
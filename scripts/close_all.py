@@ -6,37 +6,51 @@ from pathlib import Path
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
-from src.exchange import create_exchange
+from src.exchange import create_exchange, warmup
 from src.utils import logger, setup_logger
 
+# Max in-flight close orders (Binance futures allows ~10 orders/sec)
+CLOSE_CONCURRENCY = 8
+
 async def main():
     setup_logger()
     print("Connecting to Binance...")
     exchange = create_exchange("binance", testnet=False)
     
     try:
+        # Load spot + perp markets once up front instead of on the first order
+        await warmup(exchange)
+        
         print("\n=== Closing All Positions & Assets ===")
         
         # 1. Close Futures Positions
         print("\n[Futures] Checking positions...")
         positions = await exchange.perp.fetch_positions()
-        active_positions = [p for p in positions if float(p['info']['positionAmt']) != 0]
+        # Parse positionAmt once while filtering; the close loop reuses the float
+        active_positions = [
+            (p, amt) for p in positions if (amt := float(p['info']['positionAmt'])) != 0.0
+        ]
         
-        for p in active_positions:
+        # Close orders are independent: send them concurrently, bounded to stay under the order rate limit
+        semaphore = asyncio.Semaphore(CLOSE_CONCURRENCY)
+        
+        async def close_position(p, amt):
             symbol = p['symbol']
-            amt = float(p['info']['positionAmt'])
             side = "sell" if amt > 0 else "buy" # To close long, sell. To close short, buy.
             print(f"  Closing {symbol} (Size: {amt})...")
-            try:
-                await exchange.perp.create_order(
-                    symbol=symbol,
-                    type="market",
-                    side=side,
-                    amount=abs(amt)
-                )
-                print(f"  ✅ Closed {symbol}")
-            except Exception as e:
-                print(f"  ❌ Failed to close {symbol}: {e}")
+            async with semaphore:
+                try:
+                    await exchange.perp.create_order(
+                        symbol=symbol,
+                        type="market",
+                        side=side,
+                        amount=abs(amt)
+                    )
+                    print(f"  ✅ Closed {symbol}")
+                except Exception as e:
+                    print(f"  ❌ Failed to close {symbol}: {e}")
+        
+        await asyncio.gather(*(close_position(p, amt) for p, amt in active_positions))
 
         # 2. Sell Spot Assets (USDC)
         # We only check USDC for now as that's what we traded
@@ -9,6 +9,7 @@ from decimal import Decimal
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
+from src.exchange import warmup
 from src.exchange.binance import BinanceAdapter
 from src.utils import logger, setup_logger
 
@@ -38,9 +39,8 @@ async def main():
         
         logger.info(f"Checking symbols: {target_symbol_spot} and {target_symbol_perp}")
         
-        # Load markets
-        await exchange.spot.load_markets()
-        await exchange.perp.load_markets()
+        # Load spot + perp markets concurrently
+        await warmup(exchange)
         
         spot_exists = target_symbol_spot in exchange.spot.markets
         perp_exists = target_symbol_perp in exchange.perp.markets
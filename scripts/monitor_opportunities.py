@@ -1,63 +1,157 @@
 """
 监控脚本 - 高收益套利机会监控
 当发现费率 >= 0.5% 的机会时发送 Telegram 通知
+启动时全量扫描一次，之后由行情推送 (费率上穿阈值) 触发评估
 """
 import asyncio
+import heapq
 import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
-from decimal import Decimal
 from datetime import datetime
 
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
-from src.exchange import create_exchange
+from src.exchange import create_exchange, warmup, refresh_markets, BinanceMarketStream, RateTick, RATE_SCALE
 from src.strategy.scanner import Scanner
-from src.utils import setup_logger, logger, config, telegram, format_rate, format_usdt
+from src.utils import setup_logger, logger, config, telegram, format_rate, format_usdt, install_uvloop
 
 
 # 监控配置
-MIN_RATE_THRESHOLD = Decimal("0.005")  # 0.5% 最低费率
-SCAN_INTERVAL = 300  # 5分钟扫描一次
+MIN_RATE_THRESHOLD = 0.005  # 0.5% 最低费率 (float，热路径比较)
 NOTIFY_COOLDOWN = 3600  # 同一交易对1小时内只通知一次
+MAX_NOTIFIED = 4096  # 冷却记录上限
+
+# 推送热路径使用的整数阈值
+MIN_RATE_TICKS = round(MIN_RATE_THRESHOLD * RATE_SCALE)
+NOTIFY_TEST_SIZE = 50.0  # 预期收益测算仓位 (USDT)
+
+
+@dataclass(frozen=True, slots=True)
+class MonitorConfig:
+    """监控参数快照 (导入时固定)，热路径绑定为局部变量后按槽位读取"""
+    min_rate_threshold: float
+    min_rate_ticks: int
+    notify_cooldown: float
+    test_size: float
+
+
+CFG = MonitorConfig(
+    min_rate_threshold=MIN_RATE_THRESHOLD,
+    min_rate_ticks=MIN_RATE_TICKS,
+    notify_cooldown=NOTIFY_COOLDOWN,
+    test_size=NOTIFY_TEST_SIZE,
+)
 
 
 class OpportunityMonitor:
     """套利机会监控器"""
     
     def __init__(self):
-        self.notified_symbols = {}  # {symbol: last_notify_time}
+        # {symbol: 上次通知的单调时钟时间}，按通知先后排列
+        self.notified_symbols: OrderedDict[str, float] = OrderedDict()
         self.exchange = None
         self.scanner = None
+        self.stream = None
+        
+        # 行情推送的最新整数费率 {symbol: ticks}
+        self._rate_ticks: dict[str, int] = {}
+        # 推送触发的待评估交易对
+        self._pending: set[str] = set()
+        self._signal_task = None
     
     async def start(self):
         """启动监控"""
-        logger.info("=" * 70)
-        logger.info("🔍 套利机会监控器启动")
-        logger.info("=" * 70)
-        logger.info(f"  最低费率门槛: {format_rate(MIN_RATE_THRESHOLD)}")
-        logger.info(f"  扫描间隔: {SCAN_INTERVAL} 秒")
-        logger.info(f"  Telegram 通知: {'✅ 已启用' if telegram.enabled else '❌ 未配置'}")
-        logger.info("=" * 70)
-        logger.info("")
+        # 启动横幅拼成一条日志输出
+        logger.info("\n".join([
+            "",
+            "=" * 70,
+            "🔍 套利机会监控器启动",
+            "=" * 70,
+            f"  最低费率门槛: {format_rate(MIN_RATE_THRESHOLD)}",
+            f"  触发方式: 行情推送 (费率上穿门槛)",
+            f"  Telegram 通知: {'✅ 已启用' if telegram.enabled else '❌ 未配置'}",
+            "=" * 70,
+        ]))
         
         self.exchange = create_exchange("binance", testnet=False)
         self.scanner = Scanner(self.exchange)
+        self.stream = BinanceMarketStream(on_rates=self.on_rates)
         
+        refresh_task = None
         try:
-            while True:
-                await self.scan_and_notify()
-                logger.info(f"⏳ 等待 {SCAN_INTERVAL} 秒后再次扫描...")
-                logger.info("")
-                await asyncio.sleep(SCAN_INTERVAL)
+            # 启动时一次性加载市场信息，之后每小时后台刷新
+            await warmup(self.exchange)
+            refresh_task = asyncio.create_task(refresh_markets(self.exchange))
+            
+            # 全量扫描一次，初始化费率缓存并通知当前已有的机会
+            await self.scan_and_notify()
+            
+            # 之后只在费率上穿门槛时评估对应交易对
+            logger.info("📡 订阅行情推送，等待费率上穿门槛...")
+            await self.stream.run()
         
         except KeyboardInterrupt:
             logger.info("")
             logger.info("👋 监控已停止")
         finally:
+            self.stream.stop()
+            for task in (refresh_task, self._signal_task):
+                if task and not task.done():
+                    task.cancel()
+            await telegram.close()
             if self.exchange:
                 await self.exchange.close()
     
+    def on_rates(self, ticks: list[RateTick]) -> None:
+        """行情推送回调: 费率上穿门槛的交易对加入待评估队列 (只做整数比较)"""
+        cfg = CFG
+        min_ticks = cfg.min_rate_ticks
+        last_ticks = self._rate_ticks
+        
+        crossed = []
+        for tick in ticks:
+            symbol = tick.symbol
+            above = abs(tick.ticks) >= min_ticks
+            prev = last_ticks.get(symbol)
+            last_ticks[symbol] = tick.ticks
+            
+            if prev is None:
+                # 首次推送，与启动扫描的缓存比较
+                cached = self.scanner.get_cached_rate(symbol)
+                prev_above = cached is not None and abs(float(cached.rate)) >= cfg.min_rate_threshold
+            else:
+                prev_above = abs(prev) >= min_ticks
+            
+            if above and not prev_above:
+                crossed.append(symbol)
+                self.scanner.update_rate(tick.to_funding_rate())
+        
+        if not crossed:
+            return
+        
+        logger.info(f"⚡ 费率上穿门槛: {', '.join(crossed[:5])}{' ...' if len(crossed) > 5 else ''}")
+        self._pending.update(crossed)
+        if self._signal_task is None or self._signal_task.done():
+            self._signal_task = asyncio.create_task(self.evaluate_signals())
+    
+    async def evaluate_signals(self):
+        """评估推送触发的交易对 (只请求触发交易对的行情与深度)"""
+        while self._pending:
+            symbols = self._pending
+            self._pending = set()
+            
+            try:
+                pools = await self.scanner.scan_symbols(list(symbols))
+                if pools:
+                    await self.notify_pools(self.scanner.selector.filter(pools))
+            except Exception as e:
+                logger.error(f"推送触发评估异常: {e}")
+    
     async def scan_and_notify(self):
         """扫描并通知"""
         try:
@@ -70,42 +164,59 @@ class OpportunityMonitor:
                 logger.info("  未发现符合条件的机会")
                 return
             
-            # 筛选高费率机会
-            high_rate_pools = [
-                p for p in pools
-                if abs(p.funding_rate) >= MIN_RATE_THRESHOLD
-            ]
-            
-            if not high_rate_pools:
-                logger.info(f"  发现 {len(pools)} 个机会，但费率都低于 {format_rate(MIN_RATE_THRESHOLD)}")
-                return
-            
-            # 按费率排序
-            high_rate_pools.sort(key=lambda x: abs(x.funding_rate), reverse=True)
-            
-            logger.info(f"  🎯 发现 {len(high_rate_pools)} 个高费率机会!")
-            
-            # 通知前 3 个
-            for pool in high_rate_pools[:3]:
-                await self.notify_if_needed(pool)
+            await self.notify_pools(pools)
         
         except Exception as e:
             logger.error(f"扫描异常: {e}")
     
+    async def notify_pools(self, pools: list):
+        """从候选池中挑出高费率机会并通知"""
+        self._expire_cooldowns()
+        min_rate = CFG.min_rate_threshold
+        
+        # 筛选高费率机会 (float 比较；全市场费率的向量化筛选已在 Scanner.scan 中完成，
+        # 到这里的候选池只有几十个，逐个取属性组装 numpy 数组反而比列表推导更慢)
+        high_rate_pools = [
+            p for p in pools
+            if p.abs_rate >= min_rate
+        ]
+        
+        if not high_rate_pools:
+            logger.info(f"  发现 {len(pools)} 个机会，但费率都低于 {format_rate(min_rate)}")
+            return
+        
+        logger.info(f"  🎯 发现 {len(high_rate_pools)} 个高费率机会!")
+        
+        # 通知费率最高的 3 个 (只取前 k 个，不做全量排序)
+        for pool in heapq.nlargest(3, high_rate_pools, key=attrgetter("abs_rate")):
+            await self.notify_if_needed(pool)
+    
+    def _expire_cooldowns(self) -> None:
+        """清理已过冷却期的记录 (按通知先后排列，从最早的开始)"""
+        now = time.monotonic()
+        cooldown = CFG.notify_cooldown
+        notified = self.notified_symbols
+        while notified:
+            symbol, last_notify = next(iter(notified.items()))
+            if now - last_notify < cooldown:
+                break
+            del notified[symbol]
+    
     async def notify_if_needed(self, pool):
         """如果需要则发送通知"""
+        cfg = CFG
         symbol = pool.symbol
-        now = datetime.now().timestamp()
+        now = time.monotonic()
         
         # 检查冷却时间
-        last_notify = self.notified_symbols.get(symbol, 0)
-        if now - last_notify < NOTIFY_COOLDOWN:
+        last_notify = self.notified_symbols.get(symbol)
+        if last_notify is not None and now - last_notify < cfg.notify_cooldown:
             logger.debug(f"  {symbol} 在冷却期内，跳过通知")
             return
         
         # 计算预期收益
-        test_size = Decimal("50")  # 假设 50 USDT 仓位
-        daily_income = test_size * abs(pool.funding_rate) * 3  # 每天 3 次
+        test_size = cfg.test_size  # 假设 50 USDT 仓位
+        daily_income = test_size * pool.abs_rate * 3  # 每天 3 次
         
         logger.info(f"  📢 发送通知: {symbol} 费率={format_rate(pool.funding_rate)}")
         
@@ -118,8 +229,11 @@ class OpportunityMonitor:
             position_size=test_size,
         )
         
-        # 记录通知时间
+        # 记录通知时间 (移到末尾保持先后顺序)
         self.notified_symbols[symbol] = now
+        self.notified_symbols.move_to_end(symbol)
+        while len(self.notified_symbols) > MAX_NOTIFIED:
+            self.notified_symbols.popitem(last=False)
 
 
 async def main():
@@ -129,4 +243,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
@@ -11,7 +11,7 @@ ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
 from src.core import ArbitrageEngine
-from src.utils import logger
+from src.utils import logger, install_uvloop
 
 
 async def main():
@@ -31,4 +31,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
@@ -29,19 +29,19 @@ async def main():
     logger.info("=" * 60)
     
     # 1. 获取数据
-    loader = DataLoader()
     start_date = datetime.now() - timedelta(days=args.days)
     
-    # 先尝试从文件加载
-    history = loader.load_from_file(args.symbol)
-    
-    # 如果没有或者数据不够新，则重新获取
-    # (简化逻辑：这里如果加载到了就用，加载不到就获取)
-    if history is None or history.empty:
-        history = await loader.fetch_funding_history(args.symbol, start_date)
-    else:
-        # 简单检查一下时间覆盖是否足够，这里略过复杂检查
-        pass
+    async with DataLoader() as loader:
+        # 先尝试从文件加载
+        history = loader.load_from_file(args.symbol)
+        
+        # 如果没有或者数据不够新，则重新获取
+        # (简化逻辑：这里如果加载到了就用，加载不到就获取)
+        if history is None or history.empty:
+            history = await loader.fetch_funding_history(args.symbol, start_date)
+        else:
+            # 简单检查一下时间覆盖是否足够，这里略过复杂检查
+            pass
         
     if history is None or history.empty:
         logger.error("❌ 无法获取数据，回测终止")
@@ -12,7 +12,7 @@ ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
 
 from src.strategy.multi_scanner import MultiExchangeScanner
-from src.utils import setup_logger, logger
+from src.utils import setup_logger, logger, install_uvloop
 
 
 async def main(
@@ -30,9 +30,7 @@ async def main(
     """
     setup_logger()
     
-    logger.info("=" * 70)
-    logger.info("🌐 多交易所资金费率扫描器")
-    logger.info("=" * 70)
+    logger.info("\n".join(["", "=" * 70, "🌐 多交易所资金费率扫描器", "=" * 70]))
     
     # 创建多交易所扫描器
     scanner = MultiExchangeScanner(
@@ -105,6 +103,7 @@ def parse_args():
 if __name__ == "__main__":
     args = parse_args()
     
+    install_uvloop()
     asyncio.run(main(
         exchanges=args.exchanges,
         testnet=not args.live,
@@ -21,35 +21,46 @@ async def main():
     """显示持仓报表"""
     setup_logger()
     
-    logger.info("=" * 70)
-    logger.info("📊 持仓报表")
-    logger.info("=" * 70)
+    # 报表逐行收集，最后一次输出 (一条日志，而不是每行一次)
+    lines: list[str] = []
+    emit = lines.append
+    try:
+        _build_report(emit)
+    finally:
+        logger.info("\n".join(["", *lines]))
+
+
+def _build_report(emit) -> None:
+    """构建报表内容"""
+    emit("=" * 70)
+    emit("📊 持仓报表")
+    emit("=" * 70)
     
     # 加载持仓
     positions = position_store.load_all()
     
     if not positions:
-        logger.info("暂无持仓")
-        logger.info("")
+        emit("暂无持仓")
+        emit("")
         
         # 显示历史收益
         summary = funding_tracker.get_summary()
         if summary["total_records"] > 0:
-            logger.info("-" * 70)
-            logger.info("📈 历史费率收入统计")
-            logger.info("-" * 70)
-            logger.info(f"  总收入: {format_usdt(summary['total_income'])}")
-            logger.info(f"  今日收入: {format_usdt(summary['today_income'])}")
-            logger.info(f"  结算次数: {summary['total_records']}")
+            emit("-" * 70)
+            emit("📈 历史费率收入统计")
+            emit("-" * 70)
+            emit(f"  总收入: {format_usdt(summary['total_income'])}")
+            emit(f"  今日收入: {format_usdt(summary['today_income'])}")
+            emit(f"  结算次数: {summary['total_records']}")
         
-        logger.info("=" * 70)
+        emit("=" * 70)
         return
     
     # 显示持仓列表
-    logger.info("")
-    logger.info("-" * 70)
-    logger.info("当前持仓")
-    logger.info("-" * 70)
+    emit("")
+    emit("-" * 70)
+    emit("当前持仓")
+    emit("-" * 70)
     
     total_value = Decimal(0)
     total_funding = Decimal(0)
@@ -67,50 +78,50 @@ async def main():
         else:
             days_str = "-"
         
-        logger.info(
+        emit(
             f"  #{i:2d} {symbol:20} | "
             f"仓位: {format_usdt(value):>12} | "
             f"费率收入: {format_usdt(pos.funding_earned):>10} | "
             f"结算期: {pos.funding_periods:>3} | "
             f"持仓: {days_str}"
         )
-        logger.info(
+        emit(
             f"      现货: {pos.spot_qty:.6f} @ {pos.spot_avg_price:.2f} | "
             f"合约: {pos.perp_qty:.6f} @ {pos.perp_avg_price:.2f} | "
             f"Delta: {pos.delta:.4f}"
         )
     
     # 显示汇总
-    logger.info("")
-    logger.info("-" * 70)
-    logger.info("汇总")
-    logger.info("-" * 70)
-    logger.info(f"  持仓数量: {len(positions)}")
-    logger.info(f"  总仓位价值: {format_usdt(total_value)}")
-    logger.info(f"  累计费率收入: {format_usdt(total_funding)}")
+    emit("")
+    emit("-" * 70)
+    emit("汇总")
+    emit("-" * 70)
+    emit(f"  持仓数量: {len(positions)}")
+    emit(f"  总仓位价值: {format_usdt(total_value)}")
+    emit(f"  累计费率收入: {format_usdt(total_funding)}")
     
     if total_value > 0:
         roi = (total_funding / total_value) * 100
-        logger.info(f"  累计收益率: {roi:.4f}%")
+        emit(f"  累计收益率: {roi:.4f}%")
     
     # 显示费率收入统计
-    logger.info("")
-    logger.info("-" * 70)
-    logger.info("📈 费率收入统计")
-    logger.info("-" * 70)
+    emit("")
+    emit("-" * 70)
+    emit("📈 费率收入统计")
+    emit("-" * 70)
     
     summary = funding_tracker.get_summary()
-    logger.info(f"  总收入: {format_usdt(summary['total_income'])}")
-    logger.info(f"  今日收入: {format_usdt(summary['today_income'])}")
-    logger.info(f"  结算次数: {summary['total_records']}")
+    emit(f"  总收入: {format_usdt(summary['total_income'])}")
+    emit(f"  今日收入: {format_usdt(summary['today_income'])}")
+    emit(f"  结算次数: {summary['total_records']}")
     
     if summary["by_symbol"]:
-        logger.info("")
-        logger.info("  按交易对统计:")
+        emit("")
+        emit("  按交易对统计:")
         for s, income in sorted(summary["by_symbol"].items(), key=lambda x: x[1], reverse=True):
-            logger.info(f"    {s:20} {format_usdt(income):>12}")
+            emit(f"    {s:20} {format_usdt(income):>12}")
     
-    logger.info("=" * 70)
+    emit("=" * 70)
 
 
 if __name__ == "__main__":
@@ -12,7 +12,7 @@ sys.path.insert(0, str(ROOT))
 
 from src.exchange import create_exchange
 from src.strategy import Scanner
-from src.utils import setup_logger, config, logger, format_rate, format_usdt
+from src.utils import setup_logger, config, logger, format_rate, format_usdt, install_uvloop
 
 
 async def main():
@@ -36,8 +36,8 @@ async def main():
         # 创建扫描器
         scanner = Scanner(exchange)
         
-        # 执行扫描
-        candidates = await scanner.scan()
+        # 执行扫描 (命令行可指定交易对，如 BTC/USDT:USDT)
+        candidates = await scanner.scan(sys.argv[1:] or None)
         
         # 打印摘要
         logger.info("")
@@ -70,4 +70,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
@@ -14,45 +14,42 @@ secret = os.getenv('BINANCE_SECRET')
 print(f"API Key: {api_key[:20]}..." if api_key else "API Key: NOT SET")
 print(f"Secret: {secret[:20]}..." if secret else "Secret: NOT SET")
 
-async def test_spot():
-    """测试现货 API"""
-    print("\n--- Testing Spot API ---")
-    exchange = ccxt.binance({
-        'apiKey': api_key,
-        'secret': secret,
-        'enableRateLimit': True,
-    })
-    
+async def check_balance(exchange, label):
+    """查询 USDT 余额"""
     try:
         balance = await exchange.fetch_balance()
         usdt = balance.get("USDT", {}).get("free", 0)
-        print(f"SPOT OK: USDT balance = {usdt}")
+        print(f"{label} OK: USDT balance = {usdt}")
     except Exception as e:
-        print(f"SPOT ERROR: {e}")
-    finally:
-        await exchange.close()
+        print(f"{label} ERROR: {e}")
 
-async def test_futures():
-    """测试合约 API"""
-    print("\n--- Testing Futures API ---")
-    exchange = ccxt.binanceusdm({
+async def main():
+    # 现货/合约各创建一次客户端，所有请求复用同一个连接池，结束时统一关闭
+    spot = ccxt.binance({
+        'apiKey': api_key,
+        'secret': secret,
+        'enableRateLimit': True,
+    })
+    futures = ccxt.binanceusdm({
         'apiKey': api_key,
         'secret': secret,
         'enableRateLimit': True,
     })
     
     try:
-        balance = await exchange.fetch_balance()
-        usdt = balance.get("USDT", {}).get("free", 0)
-        print(f"FUTURES OK: USDT balance = {usdt}")
-    except Exception as e:
-        print(f"FUTURES ERROR: {e}")
+        print("\n--- Testing Spot API ---")
+        await check_balance(spot, "SPOT")
+        print("\n--- Testing Futures API ---")
+        await check_balance(futures, "FUTURES")
     finally:
-        await exchange.close()
-
-async def main():
-    await test_spot()
-    await test_futures()
+        await spot.close()
+        await futures.close()
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(main())
@@ -5,7 +5,6 @@
 import asyncio
 import sys
 from pathlib import Path
-from decimal import Decimal
 
 ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT))
@@ -14,7 +13,7 @@ from src.exchange import create_exchange
 from src.strategy.executor import Executor
 from src.strategy.selector import Pool
 from src.exchange.base import FundingRate, Ticker, OrderBook
-from src.utils import setup_logger, logger, format_usdt, format_rate
+from src.utils import setup_logger, logger, format_usdt, format_rate, install_uvloop
 from datetime import datetime
 
 
@@ -28,7 +27,7 @@ async def main():
     
     # 测试参数
     TEST_SYMBOL = "AVNT/USDT:USDT"
-    TEST_SIZE = Decimal("15")  # 15 USDT
+    TEST_SIZE = 15.0  # 15 USDT (下单数量由 Executor 按步长转换为 Decimal)
     
     logger.info(f"测试参数:")
     logger.info(f"  交易对: {TEST_SYMBOL}")
@@ -42,9 +41,12 @@ async def main():
     try:
         # 1. 获取当前数据
         logger.info("📊 获取市场数据...")
-        rate = await exchange.get_funding_rate(TEST_SYMBOL)
-        ticker = await exchange.get_ticker(TEST_SYMBOL)
-        orderbook = await exchange.get_orderbook(TEST_SYMBOL)
+        # 三个接口互不依赖，并发请求 (同一个 ccxt 客户端，共用连接池)
+        rate, ticker, orderbook = await asyncio.gather(
+            exchange.get_funding_rate(TEST_SYMBOL),
+            exchange.get_ticker(TEST_SYMBOL),
+            exchange.get_orderbook(TEST_SYMBOL),
+        )
         
         logger.info(f"  当前价格: ${ticker.last_price}")
         logger.info(f"  资金费率: {format_rate(rate.rate)}")
@@ -101,4 +103,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
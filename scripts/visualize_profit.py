@@ -3,12 +3,13 @@
 生成交互式 HTML 报表，展示累计收益、每日收益和币种分布
 """
 import sys
-import json
-import random
+import argparse
 from pathlib import Path
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+import numpy as np
+import orjson
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
@@ -22,72 +23,77 @@ from src.utils import logger
 
 # 数据文件路径
 DATA_DIR = ROOT / "data"
-LOG_FILE = DATA_DIR / "funding_log.json"
+LOG_FILE = DATA_DIR / "funding_log.jsonl"
 OUTPUT_DIR = ROOT / "reports"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
-def load_data():
-    """加载数据，如果不存在则生成模拟数据"""
+def load_data(demo_days: int = 30):
+    """加载数据，如果不存在则生成模拟数据 (demo_days: 模拟数据天数)"""
     if not LOG_FILE.exists():
         logger.warning("未找到真实交易数据，正在生成模拟演示数据...")
-        return generate_dummy_data()
+        return generate_dummy_data(demo_days)
     
     try:
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            
+        # 费率日志每行一条记录 (JSONL)
+        data = [orjson.loads(line) for line in LOG_FILE.read_bytes().splitlines() if line.strip()]
+        
         if not data:
             logger.warning("数据文件为空，使用模拟数据...")
-            return generate_dummy_data()
-            
-        df = pd.DataFrame(data)
-        # 类型转换
-        df['income'] = df['income'].astype(float)
-        df['rate'] = df['rate'].astype(float)
-        df['position_value'] = df['position_value'].astype(float)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+            return generate_dummy_data(demo_days)
+        
+        # 逐列直接构建 (金额/费率以字符串存储，转换时一并完成)，不先生成整张 object 表再转类型
+        n = len(data)
+        df = pd.DataFrame({
+            'symbol': [r['symbol'] for r in data],
+            'timestamp': pd.to_datetime([r['timestamp'] for r in data]),
+            'income': np.fromiter((float(r['income']) for r in data), dtype=np.float64, count=n),
+            'rate': np.fromiter((float(r['rate']) for r in data), dtype=np.float64, count=n),
+            'position_value': np.fromiter((float(r['position_value']) for r in data), dtype=np.float64, count=n),
+        })
         return df
         
     except Exception as e:
         logger.error(f"加载数据失败: {e}")
-        return generate_dummy_data()
-
-
-def generate_dummy_data():
-    """生成模拟演示数据"""
-    records = []
-    start_date = datetime.now() - timedelta(days=30)
-    symbols = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "DOGE/USDT", "ARB/USDT"]
-    
-    # 模拟30天的收益
-    current_time = start_date
-    while current_time < datetime.now():
-        # 每天 3 次结算
-        for _ in range(3):
-            # 随机选取 1-3 个持仓
-            active_symbols = random.sample(symbols, k=random.randint(1, 3))
-            
-            for symbol in active_symbols:
-                # 模拟不同币种的费率波动
-                base_rate = 0.0001 if symbol == "BTC/USDT" else 0.0005
-                rate = abs(random.gauss(base_rate, 0.0002))
-                rate = max(0.0001, rate) # 保证正数
-                
-                pos_value = 1000 # 假设 1000U 仓位
-                profit = pos_value * rate
-                
-                records.append({
-                    "symbol": symbol,
-                    "timestamp": current_time,
-                    "income": profit,
-                    "rate": rate,
-                    "position_value": pos_value
-                })
-        
-        current_time += timedelta(hours=8)
+        return generate_dummy_data(demo_days)
+
+
+def generate_dummy_data(days: int = 30, settlements_per_day: int = 3, rng: np.random.Generator = None):
+    """
+    生成模拟演示数据 (整体一次随机抽样，向量化构建)
+    
+    Args:
+        days: 模拟天数
+        settlements_per_day: 每天结算次数
+        rng: 随机数生成器 (传入固定种子可复现)
+    """
+    rng = rng or np.random.default_rng()
+    symbols = np.array(["BTC/USDT", "ETH/USDT", "SOL/USDT", "DOGE/USDT", "ARB/USDT"])
+    # 模拟不同币种的费率波动
+    base_rates = np.where(symbols == "BTC/USDT", 0.0001, 0.0005)
+    pos_value = 1000 # 假设 1000U 仓位
     
-    df = pd.DataFrame(records)
+    # 模拟 days 天的收益，按结算周期均匀分布
+    end = datetime.now()
+    times = pd.date_range(
+        end - timedelta(days=days), end, freq=timedelta(days=1) / settlements_per_day, inclusive="left"
+    )
+    shape = (len(times), len(symbols))
+    
+    # 每次结算随机选取 1-3 个持仓: 每行随机排名前 k 的交易对
+    ranks = rng.random(shape).argsort(axis=1).argsort(axis=1)
+    active = ranks < rng.integers(1, 4, size=(len(times), 1))
+    
+    rates = np.maximum(0.0001, np.abs(rng.normal(base_rates, 0.0002, size=shape))) # 保证正数
+    rates = rates[active]
+    
+    df = pd.DataFrame({
+        "symbol": np.broadcast_to(symbols, shape)[active],
+        "timestamp": np.broadcast_to(times.values[:, None], shape)[active],
+        "income": pos_value * rates,
+        "rate": rates,
+        "position_value": pos_value,
+    })
     logger.info(f"已生成 {len(df)} 条模拟数据用于演示")
     return df
 
@@ -95,8 +101,8 @@ def generate_dummy_data():
 def create_report(df):
     """创建可视化报表"""
     # 1. 数据预处理
-    # 按天汇总
-    daily_df = df.groupby(df['timestamp'].dt.date)['income'].sum().reset_index()
+    # 按天汇总 (floor 保持 datetime64 列，分组走数值哈希而不是 Python date 对象)
+    daily_df = df.groupby(df['timestamp'].dt.floor('D'))['income'].sum().reset_index()
     daily_df['cumulative'] = daily_df['income'].cumsum()
     
     # 按币种汇总
@@ -189,10 +195,14 @@ def create_report(df):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="收益报表可视化")
+    parser.add_argument("--demo-days", type=int, default=30, help="无真实数据时模拟数据的天数")
+    args = parser.parse_args()
+    
     logger.info("正在生成收益分析报表...")
     
     # 1. 加载数据
-    df = load_data()
+    df = load_data(args.demo_days)
     
     if df.empty:
         logger.error("无数据可展示")
@@ -205,8 +215,9 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     # 保存 HTML (交互式)
+    # plotly.js (~3MB) 只在报表目录写一份 plotly.min.js，各报表以 script 标签引用，离线也能打开
     html_file = OUTPUT_DIR / f"profit_report_{timestamp}.html"
-    fig.write_html(str(html_file))
+    fig.write_html(str(html_file), include_plotlyjs='directory', config={'displaylogo': False})
     logger.info(f"✅ HTML 报表已生成: {html_file}")
     
     # 保存 PNG (静态图片)
@@ -3,6 +3,8 @@
 负责获取和加载历史资金费率数据
 """
 import asyncio
+import time
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -11,15 +13,89 @@ import ccxt.async_support as ccxt
 
 from src.utils import logger, config
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    # pyarrow 可选: 未安装时缓存仍读写 CSV
+    HAS_PYARROW = False
+
 DATA_DIR = Path("data/historical")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# 单次请求最多返回的资金费率条数
+FUNDING_PAGE_LIMIT = 1000
+# 单个时间窗口跨度 (毫秒): 按最短 1 小时结算周期计，1000 条内一定能覆盖整个窗口
+FUNDING_PAGE_SPAN_MS = FUNDING_PAGE_LIMIT * 3600 * 1000
+# 最长结算周期 (毫秒)
+FUNDING_INTERVAL_MAX_MS = 8 * 3600 * 1000
+# 时间窗口并发请求上限
+FETCH_CONCURRENCY = 8
+# 单个时间窗口失败后的最多尝试次数 (指数退避: 1s, 2s, ...)
+FETCH_RETRIES = 3
+# Binance 每分钟请求权重上限的退避线: 响应头报告的已用权重超过后等到下一分钟窗口
+USED_WEIGHT_BACKOFF = 2000
+
+# 进程内共享的 ccxt 客户端 {exchange_id: client}
+_CLIENTS: Dict[str, ccxt.Exchange] = {}
+
+
+def get_client(exchange_id: str) -> ccxt.Exchange:
+    """
+    获取进程内共享的合约行情客户端 (首次调用时创建)
+    
+    ccxt 客户端内部持有 aiohttp 连接池，复用同一个实例可以避免每次获取都重新 TCP + TLS 握手
+    """
+    exchange = _CLIENTS.get(exchange_id)
+    if exchange is None:
+        exchange_class = getattr(ccxt, exchange_id)
+        exchange = _CLIENTS[exchange_id] = exchange_class({
+            'enableRateLimit': True,
+            'options': {'defaultType': 'future'} # 确保是合约
+        })
+    return exchange
+
+
+async def close_clients() -> None:
+    """关闭所有共享的 ccxt 客户端 (进程退出前调用)"""
+    for exchange_id, exchange in _CLIENTS.items():
+        try:
+            await exchange.close()
+        except Exception as e:
+            logger.warning(f"关闭 {exchange_id} 连接失败: {e}")
+    _CLIENTS.clear()
+
+
+def _used_weight(exchange: ccxt.Exchange) -> int:
+    """最近一次响应头中的已用请求权重 (Binance X-MBX-USED-WEIGHT-1M)，其他交易所返回 0"""
+    headers = exchange.last_response_headers or {}
+    used = headers.get('x-mbx-used-weight-1m') or headers.get('X-MBX-USED-WEIGHT-1M')
+    return int(used) if used else 0
+
 
 class DataLoader:
     """数据加载器"""
     
-    def __init__(self, exchange_id: str = "binance"):
+    def __init__(self, exchange_id: str = "binance", exchange: ccxt.Exchange = None):
+        """
+        Args:
+            exchange_id: ccxt 交易所 ID
+            exchange: 外部注入的 ccxt 客户端 (由调用方负责关闭)，默认使用进程内共享客户端
+        """
         self.exchange_id = exchange_id
+        self._exchange = exchange
+    
+    @property
+    def exchange(self) -> ccxt.Exchange:
+        return self._exchange or get_client(self.exchange_id)
+    
+    async def __aenter__(self) -> "DataLoader":
+        return self
+    
+    async def __aexit__(self, *exc) -> None:
+        # 只关闭共享客户端，注入的客户端由调用方管理
+        if self._exchange is None:
+            await close_clients()
         
     async def fetch_funding_history(
         self,
@@ -45,82 +121,142 @@ class DataLoader:
             
         logger.info(f"📥 开始获取 {symbol} 资金费率历史数据 ({start_date.date()} - {end_date.date()})")
         
-        # 转换 symbol 格式 (CCXT 格式)
-        # 注意: ccxt fetchFundingRateHistory 使用的是 unified symbol
+        start_ts = int(start_date.timestamp() * 1000)
+        end_ts = int(end_date.timestamp() * 1000)
         
-        exchange_class = getattr(ccxt, self.exchange_id)
-        exchange = exchange_class({
-            'enableRateLimit': True,
-            'options': {'defaultType': 'future'} # 确保是合约
-        })
+        # 增量更新: 本地缓存覆盖起点 (首条记录距起点不足一个结算周期) 且中间无缺口时只补拉缓存之后的部分
+        since = start_ts
+        cached = self._read_cache(symbol) if save_to_file else None
+        if cached is not None and not cached.empty and self._cache_covers(cached, start_ts):
+            since = max(start_ts, int(cached['timestamp'].max()) + 1)
+            logger.info(f"📖 本地缓存 {len(cached)} 条，增量获取 {pd.to_datetime(since, unit='ms')} 之后的数据")
+        else:
+            cached = None
         
-        all_rates = []
-        try:
-            since = int(start_date.timestamp() * 1000)
-            end_ts = int(end_date.timestamp() * 1000)
-            
-            while since < end_ts:
-                # 获取数据
-                rates = await exchange.fetch_funding_rate_history(symbol, since, limit=1000)
-                
-                if not rates:
-                    break
-                    
-                all_rates.extend(rates)
-                
-                # 更新时间戳
-                last_ts = rates[-1]['timestamp']
-                if last_ts == since: # 防止死循环
-                    break
-                since = last_ts + 1
-                
-                logger.debug(f"  已获取 {len(all_rates)} 条数据...")
-                await asyncio.sleep(0.5) # 限流
-                
-        except Exception as e:
-            logger.error(f"❌ 获取数据失败: {e}")
-        finally:
-            await exchange.close()
-            
-        if not all_rates:
+        df, complete = await self._fetch_range(symbol, since, end_ts)
+        if not complete:
+            logger.warning(f"⚠️ {symbol} 部分时间窗口获取失败，返回的数据中间存在缺口")
+        if not df.empty:
+            logger.info(f"✅ 成功获取 {len(df)} 条记录")
+        
+        if cached is not None:
+            if not df.empty:
+                df = pd.concat([cached, df]).drop_duplicates('timestamp').sort_values('timestamp', ignore_index=True)
+            else:
+                df = cached
+        elif df.empty:
             logger.warning(f"⚠️ 未获取到 {symbol} 的数据")
-            return pd.DataFrame()
-            
-        # 转换为 DataFrame
-        df = pd.DataFrame(all_rates)
-        df = df[['timestamp', 'fundingRate', 'symbol']]
-        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df = df.rename(columns={'fundingRate': 'rate'})
+            return df
+        
+        # 有时间窗口失败时不写缓存: 否则缺口之后的增量更新只从缓存末尾开始，缺口永远不会补上
+        if save_to_file and complete and len(df) > (0 if cached is None else len(cached)):
+            self._save_to_file(df, symbol)
         
         # 过滤时间范围
-        df = df[(df['timestamp'] >= int(start_date.timestamp() * 1000)) & 
-                (df['timestamp'] <= end_ts)]
+        return df[(df['timestamp'] >= start_ts) & (df['timestamp'] <= end_ts)]
+
+    async def _fetch_range(self, symbol: str, since: int, end_ts: int) -> tuple[pd.DataFrame, bool]:
+        """
+        从交易所获取 [since, end_ts] 区间的资金费率
+        
+        Returns:
+            (DataFrame, 是否完整): 任一时间窗口重试后仍失败时为 False，数据中间有缺口
+        """
+        # 注意: ccxt fetchFundingRateHistory 使用的是 unified symbol
+        exchange = self.exchange
         
-        logger.info(f"✅ 成功获取 {len(df)} 条记录")
+        # 预先切分时间窗口并发获取 (限流交给 ccxt enableRateLimit 的令牌桶)
+        chunks = [(t, min(t + FUNDING_PAGE_SPAN_MS, end_ts)) for t in range(since, end_ts, FUNDING_PAGE_SPAN_MS)]
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
         
-        if save_to_file:
-            self._save_to_csv(df, symbol)
+        async def fetch_chunk(start: int, end: int) -> Optional[List[Dict]]:
+            """获取单个时间窗口，重试后仍失败返回 None"""
+            for attempt in range(FETCH_RETRIES):
+                if attempt:
+                    await asyncio.sleep(2 ** (attempt - 1))  # 退避期间不占用信号量
+                async with semaphore:
+                    try:
+                        rates = await exchange.fetch_funding_rate_history(
+                            symbol, start, limit=FUNDING_PAGE_LIMIT, params={'until': end}
+                        )
+                    except Exception as e:
+                        logger.warning(f"获取 {pd.to_datetime(start, unit='ms')} 起的数据失败 (第 {attempt + 1} 次): {e}")
+                        continue
+                    
+                    # 常规节奏交给 ccxt 令牌桶；只有权重接近上限时才按响应头退避 (持有信号量，其余窗口一并等待)
+                    used = _used_weight(exchange)
+                    if used >= USED_WEIGHT_BACKOFF:
+                        wait = 60 - time.time() % 60
+                        logger.warning(f"⏳ 已用请求权重 {used}，等待 {wait:.1f}s 进入下一分钟窗口")
+                        await asyncio.sleep(wait)
+                    return rates
             
-        return df
+            logger.error(f"❌ 获取数据失败: {pd.to_datetime(start, unit='ms')} - {pd.to_datetime(end, unit='ms')}")
+            return None
+        
+        results = await asyncio.gather(*(fetch_chunk(*chunk) for chunk in chunks))
+        complete = all(rates is not None for rates in results)
+        all_rates = [rate for rates in results if rates for rate in rates]
+        logger.debug(f"  已获取 {len(all_rates)} 条数据 ({len(chunks)} 个时间窗口)")
+        
+        if not all_rates:
+            return pd.DataFrame(), complete
+            
+        # 只取需要的三列直接构建 (跳过每条记录的 info 原始字段等)
+        n = len(all_rates)
+        df = pd.DataFrame({
+            'timestamp': np.fromiter((r['timestamp'] for r in all_rates), dtype=np.int64, count=n),
+            'rate': np.fromiter((r['fundingRate'] for r in all_rates), dtype=np.float64, count=n),
+            'symbol': [r['symbol'] for r in all_rates],
+        })
+        df = df.drop_duplicates('timestamp').sort_values('timestamp', ignore_index=True) # 窗口边界可能重叠
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df[(df['timestamp'] >= since) & (df['timestamp'] <= end_ts)], complete
 
-    def _save_to_csv(self, df: pd.DataFrame, symbol: str):
-        """保存数据到 CSV"""
+    @staticmethod
+    def _cache_covers(cached: pd.DataFrame, start_ts: int) -> bool:
+        """缓存是否连续覆盖 [start_ts, 缓存末尾]: 首条记录距起点、相邻记录之间都不超过一个最长结算周期"""
+        timestamps = np.sort(cached['timestamp'].to_numpy())
+        if timestamps[0] >= start_ts + FUNDING_INTERVAL_MAX_MS:
+            return False
+        covered = timestamps[timestamps >= start_ts - FUNDING_INTERVAL_MAX_MS]
+        return not (np.diff(covered) > FUNDING_INTERVAL_MAX_MS).any()
+
+    def _cache_path(self, symbol: str, suffix: str) -> Path:
+        """本地缓存文件路径"""
         safe_symbol = symbol.replace("/", "_")
-        filename = DATA_DIR / f"{self.exchange_id}_{safe_symbol}_funding.csv"
-        df.to_csv(filename, index=False)
+        return DATA_DIR / f"{self.exchange_id}_{safe_symbol}_funding{suffix}"
+
+    def _save_to_file(self, df: pd.DataFrame, symbol: str):
+        """保存数据到本地缓存 (优先 Parquet，保留列类型，读取无需重新解析文本)"""
+        if HAS_PYARROW:
+            filename = self._cache_path(symbol, ".parquet")
+            df.to_parquet(filename, compression='zstd', engine='pyarrow', index=False)
+        else:
+            filename = self._cache_path(symbol, ".csv")
+            df.to_csv(filename, index=False)
         logger.info(f"💾 数据已保存到: {filename}")
 
-    def load_from_file(self, symbol: str) -> Optional[pd.DataFrame]:
-        """从本地文件加载数据"""
-        safe_symbol = symbol.replace("/", "_")
-        filename = DATA_DIR / f"{self.exchange_id}_{safe_symbol}_funding.csv"
+    def _read_cache(self, symbol: str) -> Optional[pd.DataFrame]:
+        """读取本地缓存 (Parquet 优先，兼容旧的 CSV 缓存)，不存在返回 None"""
+        filename = self._cache_path(symbol, ".parquet")
+        if HAS_PYARROW and filename.exists():
+            return pd.read_parquet(filename, engine='pyarrow')
         
+        filename = self._cache_path(symbol, ".csv")
         if not filename.exists():
-            logger.warning(f"⚠️ 文件不存在: {filename}")
             return None
-            
         df = pd.read_csv(filename)
         df['datetime'] = pd.to_datetime(df['datetime'])
+        return df
+
+    def load_from_file(self, symbol: str) -> Optional[pd.DataFrame]:
+        """从本地文件加载数据"""
+        df = self._read_cache(symbol)
+        if df is None:
+            logger.warning(f"⚠️ 文件不存在: {self._cache_path(symbol, '.parquet' if HAS_PYARROW else '.csv')}")
+            return None
+        
         logger.info(f"📖 从文件加载了 {len(df)} 条记录")
         return df
 
@@ -128,8 +264,8 @@ class DataLoader:
 # 测试代码
 if __name__ == "__main__":
     async def test():
-        loader = DataLoader()
-        start = datetime.now() - timedelta(days=30)
-        await loader.fetch_funding_history("BTC/USDT", start)
+        async with DataLoader() as loader:
+            start = datetime.now() - timedelta(days=30)
+            await loader.fetch_funding_history("BTC/USDT", start)
         
     asyncio.run(test())
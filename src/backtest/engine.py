@@ -2,13 +2,180 @@
 回测引擎
 模拟资金费率套利策略在历史数据上的表现
 """
+import numpy as np
 import pandas as pd
 from decimal import Decimal
+from collections.abc import Sequence
 from typing import Dict, List, Any
 from dataclasses import dataclass
 
 from src.utils import logger, format_usdt, format_rate
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    # numba 可选: 未安装时核心循环以纯 Python 运行 (输入先转为 list，避免逐元素索引 ndarray)
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# 事件类型 (核心循环输出)
+EVENT_FUNDING = 0
+EVENT_CLOSE = 1
+EVENT_OPEN = 2
+
+# 开仓规模占当前资金的比例 (全仓单利)
+POSITION_RATIO = 0.9
+
+
+@njit(cache=True)
+def _run_core(rates, sym_ids, n_symbols, threshold, fee_rate, capital, equity, ev_row, ev_type, ev_amount):
+    """
+    回测核心循环 (只有数值数组，numba 可编译)
+    
+    持仓以交易对编号为下标存放在并行数组中 (规模、方向)；
+    事件写入预分配数组 (行号、类型、金额)，每行最多两个事件 (结算 + 平仓)
+    
+    不按交易对拆分逐个回测: 开仓规模取当时资金的 90%，而资金被所有交易对的结算/手续费共同改变，
+    单个交易对的结果依赖其他交易对在它之前发生的事件，只能按全局时间顺序推进
+    
+    Returns:
+        (期末资金, 累计资金费收入, 事件数)
+    """
+    pos_size = np.zeros(n_symbols)
+    pos_side = np.zeros(n_symbols, dtype=np.int8)  # 1: short_perp, -1: long_perp, 0: 空仓
+    total_income = 0.0
+    k = 0
+    
+    for i in range(len(rates)):
+        rate = rates[i]
+        sym = sym_ids[i]
+        sign = 1 if rate > 0 else (-1 if rate < 0 else 0)
+        side = pos_side[sym]
+        
+        if side != 0:
+            # 1. 结算: 方向与费率同号收取 size * |rate|，否则 (费率反转) 支出
+            income = pos_size[sym] * abs(rate)
+            if sign != side:
+                income = -income
+            capital += income
+            total_income += income
+            if income != 0:
+                ev_row[k] = i
+                ev_type[k] = EVENT_FUNDING
+                ev_amount[k] = income
+                k += 1
+            
+            # 2. 费率与持仓方向相反则平仓
+            if sign == -side:
+                cost = pos_size[sym] * fee_rate
+                capital -= cost
+                pos_side[sym] = 0
+                ev_row[k] = i
+                ev_type[k] = EVENT_CLOSE
+                ev_amount[k] = cost
+                k += 1
+        
+        elif abs(rate) >= threshold:
+            # 3. 开仓: 正费率做空合约，负费率做多合约
+            size = capital * POSITION_RATIO
+            cost = size * fee_rate
+            capital -= cost
+            pos_size[sym] = size
+            pos_side[sym] = 1 if rate > 0 else -1
+            ev_row[k] = i
+            ev_type[k] = EVENT_OPEN
+            ev_amount[k] = cost
+            k += 1
+        
+        equity[i + 1] = capital
+    
+    # 强制平仓所有头寸 (为了计算最终净值)
+    for sym in range(n_symbols):
+        if pos_side[sym] != 0:
+            capital -= pos_size[sym] * fee_rate
+    
+    return capital, total_income, k
+
+class TradeLog(Sequence):
+    """
+    回测交易记录
+    
+    核心循环输出的事件数组原样保存 (行号、类型、金额)，按下标/切片读取时才生成 dict，
+    调用方通常只看最近几笔；需要全部记录时用 to_frame() 一次性转为 DataFrame
+    """
+    
+    TYPE_NAMES = np.array(['funding', 'close', 'open'])  # 按事件类型编号排列
+    
+    def __init__(self, times, sym_names, sym_ids, rates, rows, kinds, amounts):
+        self._times = times
+        self._sym_names = sym_names
+        self._sym_ids = sym_ids
+        self._rates = rates
+        self._rows = rows
+        self._kinds = kinds
+        self._amounts = amounts
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(k) for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TradeLog index out of range")
+        return self._record(index)
+    
+    def _record(self, k: int) -> Dict:
+        """生成第 k 条交易记录"""
+        i = self._rows[k]
+        kind = self._kinds[k]
+        amount = float(self._amounts[k])
+        time = self._times[i]
+        symbol = self._sym_names[self._sym_ids[i]]
+        rate = float(self._rates[i])
+        
+        if kind == EVENT_FUNDING:
+            return {'time': time, 'type': 'funding', 'symbol': symbol, 'amount': amount, 'rate': rate}
+        if kind == EVENT_CLOSE:
+            return {'time': time, 'type': 'close', 'symbol': symbol, 'cost': amount}
+        return {
+            'time': time,
+            'type': 'open',
+            'symbol': symbol,
+            'side': 'short_perp' if rate > 0 else 'long_perp',
+            'rate': rate,
+            'cost': amount
+        }
+    
+    def count_opens(self) -> int:
+        """开仓次数"""
+        return int(np.count_nonzero(self._kinds == EVENT_OPEN))
+    
+    def to_frame(self) -> pd.DataFrame:
+        """全部交易记录转为 DataFrame (不适用的字段为 NaN)"""
+        rows = self._rows
+        kinds = self._kinds
+        rates = self._rates[rows]
+        is_funding = kinds == EVENT_FUNDING
+        is_open = kinds == EVENT_OPEN
+        return pd.DataFrame({
+            'time': self._times[rows],
+            'type': self.TYPE_NAMES[kinds],
+            'symbol': self._sym_names[self._sym_ids[rows]],
+            'side': np.where(is_open, np.where(rates > 0, 'short_perp', 'long_perp'), None),
+            'rate': np.where(is_funding | is_open, rates, np.nan),
+            'amount': np.where(is_funding, self._amounts, np.nan),
+            'cost': np.where(is_funding, np.nan, self._amounts),
+        })
+
+
 @dataclass
 class BacktestResult:
     """回测结果"""
@@ -20,7 +187,7 @@ class BacktestResult:
     annual_roi: float    # 年化回报率
     max_drawdown: float  # 最大回撤
     sharpe_ratio: float  # 夏普比率
-    daily_logs: List[Dict] # 每日记录
+    daily_logs: Sequence[Dict] # 每日记录 (TradeLog)
 
 class BacktestEngine:
     """回测引擎"""
@@ -54,110 +221,35 @@ class BacktestEngine:
         # 按时间排序
         data = data.sort_values('datetime')
         
-        # 初始化记录
-        daily_pnl = []
-        equity_curve = [self.initial_capital]
-        trades = []
+        # 整列预处理: 交易对映射为整数编号，时间/费率取原生数组，交给数值核心循环
+        # (开仓规模取当时资金的 90%，资金在交易对之间共享，这一部分只能按时间顺序推进)
+        rates = data['rate'].to_numpy(dtype=np.float64)
+        sym_ids, sym_names = pd.factorize(data['symbol'])
+        fee_rate = self.spot_fee + self.futures_fee
         
-        total_income = 0.0
+        n = len(rates)
+        equity_curve = np.empty(n + 1, dtype=np.float64)
+        equity_curve[0] = self.initial_capital
+        ev_row = np.empty(2 * n, dtype=np.int64)
+        ev_type = np.empty(2 * n, dtype=np.int8)
+        ev_amount = np.empty(2 * n, dtype=np.float64)
         
-        # 遍历每个时间点 (资金费率结算点)
-        for _, row in data.iterrows():
-            rate = float(row['rate'])
-            timestamp = row['datetime']
-            symbol = row['symbol']
-            
-            current_equity = self.capital
-            
-            # --- 1. 结算现有持仓 ---
-            if symbol in self.positions:
-                pos = self.positions[symbol]
-                
-                # 计算资金费收入
-                # 正费率: 空头收钱 (我们做空) -> 收益 = 仓位 * 费率
-                # 负费率: 多头收钱 (我们做多) -> 收益 = 仓位 * 绝对值费率
-                # 策略: 
-                #   rate > 0: 做空 (Spot Buy + Perp Sell) -> 赚 rate
-                #   rate < 0: 做多 (Spot Sell + Perp Buy) -> 赚 abs(rate)
-                # 简而言之，只要方向做对，收入就是 position_value * abs(rate)
-                
-                # 检查方向是否正确
-                # 如果持仓是正向套利(做空期货)，且 rate > 0 => 赚钱
-                # 如果持仓是反向套利(做多期货)，且 rate < 0 => 赚钱
-                
-                income = 0
-                if pos['side'] == 'short_perp' and rate > 0:
-                    income = pos['size'] * rate
-                elif pos['side'] == 'long_perp' and rate < 0:
-                    income = pos['size'] * abs(rate)
-                else:
-                    # 费率反转，支出资金费
-                    income = -pos['size'] * abs(rate)
-                
-                self.capital += income
-                total_income += income
-                
-                # 记录日志
-                if abs(income) > 0:
-                    trades.append({
-                        'time': timestamp,
-                        'type': 'funding',
-                        'symbol': symbol,
-                        'amount': income,
-                        'rate': rate
-                    })
-                
-                # --- 2. 检查是否平仓 ---
-                # 如果费率低于平仓阈值(例如 0)，或者是负收益
-                if (pos['side'] == 'short_perp' and rate < 0) or \
-                   (pos['side'] == 'long_perp' and rate > 0):
-                    
-                    # 平仓
-                    cost = pos['size'] * (self.spot_fee + self.futures_fee)
-                    self.capital -= cost
-                    
-                    del self.positions[symbol]
-                    trades.append({
-                        'time': timestamp,
-                        'type': 'close',
-                        'symbol': symbol,
-                        'cost': cost
-                    })
-            
-            # --- 3. 检查是否开仓 ---
-            elif abs(rate) >= threshold:
-                # 计算可用资金
-                # 简单起见，假设全仓单利模式，或者固定金额
-                position_size = self.capital * 0.9 # 90% 仓位
-                
-                side = 'short_perp' if rate > 0 else 'long_perp'
-                
-                # 开仓成本
-                cost = position_size * (self.spot_fee + self.futures_fee)
-                self.capital -= cost
-                
-                self.positions[symbol] = {
-                    'size': position_size,
-                    'side': side,
-                    'entry_time': timestamp
-                }
-                
-                trades.append({
-                    'time': timestamp,
-                    'type': 'open',
-                    'symbol': symbol,
-                    'side': side,
-                    'rate': rate,
-                    'cost': cost
-                })
-            
-            equity_curve.append(self.capital)
+        if HAS_NUMBA:
+            core_rates, core_ids = rates, sym_ids.astype(np.int64)
+        else:
+            core_rates, core_ids = rates.tolist(), sym_ids.tolist()
         
-        # 强制平仓所有头寸(为了计算最终净值)
-        for symbol, pos in list(self.positions.items()):
-            cost = pos['size'] * (self.spot_fee + self.futures_fee)
-            self.capital -= cost
-            del self.positions[symbol]
+        self.capital, total_income, n_events = _run_core(
+            core_rates, core_ids, len(sym_names), float(threshold), fee_rate, float(self.capital),
+            equity_curve, ev_row, ev_type, ev_amount,
+        )
+        self.positions.clear()
+        
+        # 事件数组直接作为交易记录 (列式存储，读取时才生成 dict)
+        trades = TradeLog(
+            data['datetime'].array, sym_names, sym_ids, rates,
+            ev_row[:n_events], ev_type[:n_events], ev_amount[:n_events],
+        )
         
         # 计算指标
         total_days = (data['datetime'].max() - data['datetime'].min()).days
@@ -167,19 +259,15 @@ class BacktestEngine:
         roi = net_profit / self.initial_capital
         annual_roi = roi * (365 / total_days)
         
-        # 最大回撤
-        max_eq = equity_curve[0]
-        max_drawdown = 0
-        for eq in equity_curve:
-            if eq > max_eq:
-                max_eq = eq
-            dd = (max_eq - eq) / max_eq
-            if dd > max_drawdown:
-                max_drawdown = dd
+        # 最大回撤 (历史最高净值的累计最大值，一次向量化计算)
+        running_max = np.maximum.accumulate(equity_curve)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = np.where(running_max > 0, (running_max - equity_curve) / running_max, 0.0)
+        max_drawdown = float(drawdowns.max())
                 
         return BacktestResult(
             total_days=total_days,
-            total_trades=len([t for t in trades if t['type'] == 'open']),
+            total_trades=trades.count_opens(),
             total_income=total_income,
             net_profit=net_profit,
             roi=roi,
@@ -5,6 +5,7 @@ from src.core.engine import ArbitrageEngine
 from src.core.risk import RiskManager, RiskAction, RiskCheckResult
 from src.core.position_store import PositionStore, position_store
 from src.core.funding_tracker import FundingTracker, funding_tracker
+from src.core.opportunity_log import OpportunityLog, opportunity_log
 
 __all__ = [
     "ArbitrageEngine",
@@ -15,5 +16,7 @@ __all__ = [
     "position_store",
     "FundingTracker",
     "funding_tracker",
+    "OpportunityLog",
+    "opportunity_log",
 ]
 
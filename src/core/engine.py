@@ -32,16 +32,7 @@ class ArbitrageEngine:
         setup_logger()
         
         # 交易所
-        if exchange is None:
-            exchange_cfg = config.get_exchange_config(config.default_exchange)
-            self.exchange = create_exchange(
-                config.default_exchange,
-                api_key=exchange_cfg.get("api_key", ""),
-                secret=exchange_cfg.get("secret", ""),
-                testnet=exchange_cfg.get("testnet", True),
-            )
-        else:
-            self.exchange = exchange
+        self.exchange = exchange if exchange is not None else self._create_default_exchange()
         
         # 核心组件
         self.scanner = Scanner(self.exchange)
@@ -51,6 +42,8 @@ class ArbitrageEngine:
         # 状态
         self.running = False
         self.capital = config.initial_capital
+        # 停止信号: 等待间隔期间收到 stop() 立即唤醒，不必等满一个扫描周期
+        self._stop_event = asyncio.Event()
         
         logger.info(
             f"套利引擎初始化: "
@@ -59,6 +52,17 @@ class ArbitrageEngine:
             f"时区={config.trading_timezone}"
         )
     
+    @staticmethod
+    def _create_default_exchange() -> ExchangeBase:
+        """按配置创建默认交易所适配器"""
+        exchange_cfg = config.get_exchange_config(config.default_exchange)
+        return create_exchange(
+            config.default_exchange,
+            api_key=exchange_cfg.get("api_key", ""),
+            secret=exchange_cfg.get("secret", ""),
+            testnet=exchange_cfg.get("testnet", True),
+        )
+    
     async def run(self) -> None:
         """
         主运行循环
@@ -71,7 +75,7 @@ class ArbitrageEngine:
                 # 检查交易时间
                 if not is_trading_time():
                     logger.info("⏰ 非交易时间，等待...")
-                    await asyncio.sleep(60)
+                    await self._wait(60)
                     continue
                 
                 # 检查风险限制
@@ -86,7 +90,7 @@ class ArbitrageEngine:
                 await self._run_cycle()
                 
                 # 等待下一轮
-                await asyncio.sleep(config.scan_interval)
+                await self._wait(config.scan_interval)
                 
         except KeyboardInterrupt:
             logger.info("👋 收到中断信号，优雅退出...")
@@ -95,6 +99,18 @@ class ArbitrageEngine:
         finally:
             await self.shutdown()
     
+    def stop(self) -> None:
+        """请求停止主循环 (正在等待时立即返回)"""
+        self.running = False
+        self._stop_event.set()
+    
+    async def _wait(self, timeout: float) -> None:
+        """等待指定秒数，收到停止信号时提前返回"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
     async def _run_cycle(self) -> None:
         """
         执行一轮扫描-执行周期
@@ -133,14 +149,22 @@ class ArbitrageEngine:
         
         logger.info(f"📊 监控 {len(positions)} 个持仓")
         
-        for pos in positions:
-            # 获取当前费率
-            rate = self.scanner.get_cached_rate(pos.symbol)
-            
-            # 获取合约持仓的保证金率
-            exchange_pos = await self.exchange.get_position(pos.symbol)
-            margin_ratio = exchange_pos.margin_ratio if exchange_pos else None
-            
+        # 一次批量请求取回全部合约持仓 (交易所接口本身返回所有交易对)，本轮监控共用
+        try:
+            exchange_positions = {p.symbol: p for p in await self.exchange.get_positions()}
+        except Exception as e:
+            logger.warning(f"获取合约持仓失败: {e}")
+            exchange_positions = {}
+        
+        # 按列准备本轮数据 (交易对、费率、保证金率与持仓逐项对齐)，再单次遍历做风险检查
+        symbols = [pos.symbol for pos in positions]
+        rates = self.scanner.get_cached_rates(symbols)
+        margin_ratios = [
+            exchange_pos.margin_ratio if (exchange_pos := exchange_positions.get(symbol)) else None
+            for symbol in symbols
+        ]
+        
+        for pos, rate, margin_ratio in zip(positions, rates, margin_ratios):
             # 风险检查
             result = self.risk_manager.check(
                 position=pos,
@@ -167,8 +191,10 @@ class ArbitrageEngine:
         获取可用资金
         """
         # 现货 + 合约可用余额
-        spot_balance = await self.exchange.get_spot_balance()
-        perp_balance = await self.exchange.get_perp_balance()
+        spot_balance, perp_balance = await asyncio.gather(
+            self.exchange.get_spot_balance(),
+            self.exchange.get_perp_balance(),
+        )
         
         total = spot_balance + perp_balance
         
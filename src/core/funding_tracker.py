@@ -2,18 +2,29 @@
 核心模块 - 资金费率收入追踪
 记录每次费率结算的收入
 """
-import json
 from dataclasses import dataclass
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 from pathlib import Path
 from typing import Optional
 
-from src.utils import logger
+import orjson
+
+from src.exchange import ExchangeBase, FundingRate
+from src.utils import logger, time_to_next_funding
 
 # 数据目录
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
-FUNDING_LOG_FILE = DATA_DIR / "funding_log.json"
+# 每行一条 JSON 记录，新记录只追加不重写
+FUNDING_LOG_FILE = DATA_DIR / "funding_log.jsonl"
+
+# 费率缓存在结算前提前失效的时间 (容忍本地与交易所的时钟偏差)
+RATE_CACHE_SKEW = timedelta(seconds=30)
+# 费率缓存有效期: 远离结算时长，结算前后窗口内短 (预测费率变化集中在结算附近)
+RATE_CACHE_TTL = timedelta(minutes=5)
+RATE_CACHE_TTL_NEAR = timedelta(seconds=30)
+SETTLEMENT_WINDOW = 10 * 60      # 结算前后窗口 (秒)
+FUNDING_INTERVAL = 8 * 3600      # 结算周期 (秒)
 
 
 @dataclass
@@ -54,11 +65,91 @@ class FundingTracker:
     def __init__(self, file_path: Path = FUNDING_LOG_FILE):
         self.file_path = file_path
         self._ensure_data_dir()
+        
+        # 费率快照缓存 {symbol: (FundingRate, 过期时间)}，不超过下次结算
+        self._rate_cache: dict[str, tuple[FundingRate, datetime]] = {}
+        
+        # 收入记录内存缓存 (首次访问时读一次日志文件)，以及按交易对/日期增量维护的汇总
+        self._records: Optional[list[dict]] = None
+        self._symbol_records: dict[str, list[dict]] = {}
+        self._total_income = Decimal(0)
+        self._income_by_symbol: dict[str, Decimal] = {}
+        self._income_by_day: dict[date, Decimal] = {}
+        # 去重索引 {(交易对, ISO 时间, 收入字符串)}，同步交易所流水时 O(1) 判断
+        self._keys: set[tuple[str, str, str]] = set()
+        # 日志末行缺少换行 (写入中途崩溃留下的残行)，下次追加前先补换行，避免新记录接在残行后面
+        self._torn_tail = False
     
     def _ensure_data_dir(self) -> None:
         """确保数据目录存在"""
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
     
+    # ==================== 费率快照缓存 ====================
+    
+    @staticmethod
+    def _rate_ttl() -> timedelta:
+        """按结算节奏计算缓存有效期"""
+        remaining = time_to_next_funding()
+        near = remaining <= SETTLEMENT_WINDOW or FUNDING_INTERVAL - remaining <= SETTLEMENT_WINDOW
+        return RATE_CACHE_TTL_NEAR if near else RATE_CACHE_TTL
+    
+    def update_rate(self, rate: FundingRate) -> None:
+        """写入费率快照"""
+        expires_at = min(datetime.now() + self._rate_ttl(), rate.next_funding_time - RATE_CACHE_SKEW)
+        self._rate_cache[rate.symbol] = (rate, expires_at)
+    
+    def update_rates(self, rates: list[FundingRate]) -> None:
+        """批量写入费率快照 (全市场扫描后调用)"""
+        now = datetime.now()
+        ttl = self._rate_ttl()
+        for rate in rates:
+            self._rate_cache[rate.symbol] = (rate, min(now + ttl, rate.next_funding_time - RATE_CACHE_SKEW))
+    
+    def get_rate(self, symbol: str, now: Optional[datetime] = None) -> Optional[FundingRate]:
+        """
+        获取缓存的费率快照
+        
+        按结算节奏失效: 平时 5 分钟，结算前后 10 分钟内 30 秒，且不跨过下次结算
+        
+        Args:
+            symbol: 交易对
+            now: 当前时间，默认 datetime.now()
+            
+        Returns:
+            未过期的费率快照，没有则返回 None
+        """
+        entry = self._rate_cache.get(symbol)
+        if entry is None:
+            return None
+        
+        if now is None:
+            now = datetime.now()
+        
+        rate, expires_at = entry
+        if now >= expires_at:
+            del self._rate_cache[symbol]
+            return None
+        
+        return rate
+    
+    def is_fresh(self, rate: FundingRate, now: Optional[datetime] = None) -> bool:
+        """
+        其他缓存 (扫描器/推送) 中的费率是否仍可直接使用
+        
+        与快照缓存同一失效规则: 按获取时间 (timestamp) 计的结算节奏有效期内，且未跨过下次结算
+        """
+        if now is None:
+            now = datetime.now()
+        return now < min(rate.timestamp + self._rate_ttl(), rate.next_funding_time - RATE_CACHE_SKEW)
+    
+    async def fetch_rate(self, exchange: ExchangeBase, symbol: str) -> FundingRate:
+        """获取费率，缓存未命中时请求交易所并写入缓存"""
+        rate = self.get_rate(symbol)
+        if rate is None:
+            rate = await exchange.get_funding_rate(symbol)
+            self.update_rate(rate)
+        return rate
+    
     def record_funding(
         self,
         symbol: str,
@@ -88,9 +179,7 @@ class FundingTracker:
         )
         
         # 追加到日志
-        records = self._load_records()
-        records.append(record.to_dict())
-        self._save_records(records)
+        self._append([record])
         
         logger.info(
             f"记录费率收入 {symbol}: "
@@ -100,6 +189,35 @@ class FundingTracker:
         
         return record
     
+    def record_many(self, entries: list[tuple[str, Decimal, Decimal]]) -> list[FundingRecord]:
+        """
+        批量记录费率收入 (一次读写日志文件)
+        
+        Args:
+            entries: [(交易对, 费率, 持仓价值), ...]
+            
+        Returns:
+            费率收入记录列表
+        """
+        if not entries:
+            return []
+        
+        now = datetime.now()
+        new_records = [
+            FundingRecord(
+                symbol=symbol,
+                rate=rate,
+                position_value=position_value,
+                income=position_value * abs(rate),
+                timestamp=now,
+            )
+            for symbol, rate, position_value in entries
+        ]
+        
+        # 不在这里打印汇总，由调用方按结算期输出一行 (与 sync_remote_payments 一致)
+        self._append(new_records)
+        return new_records
+    
     def get_total_income(self, symbol: Optional[str] = None) -> Decimal:
         """
         获取总费率收入
@@ -110,14 +228,10 @@ class FundingTracker:
         Returns:
             总收入
         """
-        records = self._load_records()
-        
-        total = Decimal(0)
-        for r in records:
-            if symbol is None or r["symbol"] == symbol:
-                total += Decimal(r["income"])
-        
-        return total
+        self._get_records()
+        if symbol is None:
+            return self._total_income
+        return self._income_by_symbol.get(symbol, Decimal(0))
     
     def get_daily_income(self, day: Optional[date] = None) -> Decimal:
         """
@@ -132,28 +246,20 @@ class FundingTracker:
         if day is None:
             day = date.today()
         
-        records = self._load_records()
-        
-        total = Decimal(0)
-        for r in records:
-            record_date = datetime.fromisoformat(r["timestamp"]).date()
-            if record_date == day:
-                total += Decimal(r["income"])
-        
-        return total
+        self._get_records()
+        return self._income_by_day.get(day, Decimal(0))
     
     def get_records_by_symbol(self, symbol: str) -> list[FundingRecord]:
         """获取指定交易对的所有记录"""
-        records = self._load_records()
+        self._get_records()
         return [
             FundingRecord.from_dict(r)
-            for r in records
-            if r["symbol"] == symbol
+            for r in self._symbol_records.get(symbol, ())
         ]
     
     def get_recent_records(self, limit: int = 20) -> list[FundingRecord]:
         """获取最近的记录"""
-        records = self._load_records()
+        records = self._get_records()
         return [
             FundingRecord.from_dict(r)
             for r in records[-limit:]
@@ -171,29 +277,12 @@ class FundingTracker:
                 "by_symbol": {symbol: income},
             }
         """
-        records = self._load_records()
-        today = date.today()
-        
-        total = Decimal(0)
-        today_income = Decimal(0)
-        by_symbol: dict[str, Decimal] = {}
-        
-        for r in records:
-            income = Decimal(r["income"])
-            total += income
-            
-            symbol = r["symbol"]
-            by_symbol[symbol] = by_symbol.get(symbol, Decimal(0)) + income
-            
-            record_date = datetime.fromisoformat(r["timestamp"]).date()
-            if record_date == today:
-                today_income += income
-        
+        records = self._get_records()
         return {
-            "total_income": total,
-            "today_income": today_income,
+            "total_income": self._total_income,
+            "today_income": self._income_by_day.get(date.today(), Decimal(0)),
             "total_records": len(records),
-            "by_symbol": by_symbol,
+            "by_symbol": dict(self._income_by_symbol),
         }
 
     def sync_remote_payments(self, payments: list[dict]) -> int:
@@ -201,12 +290,10 @@ class FundingTracker:
         if not payments:
             return 0
 
-        records = self._load_records()
-        existing_keys = {
-            (r["symbol"], r.get("timestamp"), r.get("income")) for r in records
-        }
+        self._get_records()
+        existing_keys = self._keys  # 加载时建立，之后随每条新记录增量维护
 
-        added = 0
+        new_records: list[FundingRecord] = []
         for p in payments:
             symbol = p.get("symbol")
             ts = p.get("timestamp")
@@ -228,8 +315,7 @@ class FundingTracker:
                 continue
 
             existing_keys.add(key)
-            added += 1
-            records.append(
+            new_records.append(
                 FundingRecord(
                     symbol=symbol,
                     rate=rate,
@@ -238,32 +324,94 @@ class FundingTracker:
                     timestamp=datetime.fromisoformat(ts_iso)
                     if isinstance(ts_iso, str)
                     else ts,
-                ).to_dict()
+                )
             )
 
+        added = len(new_records)
         if added:
-            self._save_records(records)
+            self._append(new_records)
             logger.info(f"已从交易所资金流水同步 {added} 条记录")
 
         return added
     
+    def _get_records(self) -> list[dict]:
+        """内存中的全部记录 (首次调用时从日志文件加载并建立汇总)"""
+        if self._records is None:
+            self._records = []
+            for r in self._load_records():
+                self._index(r, Decimal(r["income"]), datetime.fromisoformat(r["timestamp"]).date())
+        return self._records
+    
+    def _index(self, r: dict, income: Decimal, day: date) -> None:
+        """把一条记录加入内存缓存并累加汇总"""
+        self._records.append(r)
+        symbol = r["symbol"]
+        self._keys.add((symbol, r.get("timestamp"), r.get("income")))
+        self._symbol_records.setdefault(symbol, []).append(r)
+        self._total_income += income
+        self._income_by_symbol[symbol] = self._income_by_symbol.get(symbol, Decimal(0)) + income
+        self._income_by_day[day] = self._income_by_day.get(day, Decimal(0)) + income
+    
+    def _append(self, new_records: list[FundingRecord]) -> None:
+        """追加记录: 更新内存缓存与汇总，日志文件只追加新的行"""
+        self._get_records()
+        rows = [record.to_dict() for record in new_records]
+        for record, r in zip(new_records, rows):
+            self._index(r, record.income, record.timestamp.date())
+        self._write_records(rows, mode="a")
+    
     def _load_records(self) -> list[dict]:
-        """加载记录"""
+        """加载记录 (JSONL，旧版 JSON 数组日志首次加载时转换)"""
         if not self.file_path.exists():
-            return []
+            return self._migrate_legacy()
         
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(self.file_path, "rb") as f:
+                lines = f.readlines()
         except Exception as e:
             logger.error(f"读取费率日志失败: {e}")
             return []
+        
+        # 逐行解析: 损坏的行 (如崩溃时写了一半的末行) 跳过，其余记录照常加载
+        records = []
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                r = orjson.loads(line)
+                FundingRecord.from_dict(r)  # 校验字段完整、可解析
+            except Exception as e:
+                logger.warning(f"费率日志第 {lineno} 行损坏，已跳过: {e}")
+                continue
+            records.append(r)
+        
+        self._torn_tail = bool(lines) and not lines[-1].endswith(b"\n")
+        return records
+    
+    def _migrate_legacy(self) -> list[dict]:
+        """旧版日志 (同名 .json，整个文件一个数组) 转换为 JSONL"""
+        legacy = self.file_path.with_suffix(".json")
+        if not legacy.exists():
+            return []
+        
+        try:
+            records = orjson.loads(legacy.read_bytes())
+        except Exception as e:
+            logger.error(f"读取旧版费率日志失败: {e}")
+            return []
+        
+        self._write_records(records, mode="w")
+        logger.info(f"费率日志已转换为 JSONL: {legacy} -> {self.file_path} ({len(records)} 条)")
+        return records
     
-    def _save_records(self, records: list[dict]) -> None:
-        """保存记录"""
+    def _write_records(self, records: list[dict], mode: str) -> None:
+        """写入记录 (每行一条 JSON，orjson 序列化，mode="a" 追加)"""
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(records, f, indent=2, ensure_ascii=False)
+            with open(self.file_path, mode + "b") as f:
+                if mode == "a" and self._torn_tail:
+                    f.write(b"\n")
+                self._torn_tail = False
+                f.writelines(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE) for r in records)
         except Exception as e:
             logger.error(f"保存费率日志失败: {e}")
 
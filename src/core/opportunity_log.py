@@ -0,0 +1,98 @@
+"""
+核心模块 - 套利机会历史
+评估过的候选池按天追加写入 msgpack 文件，供事后分析/回测使用
+"""
+import time
+from datetime import date
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+import msgpack
+
+from src.strategy.selector import Pool
+from src.utils import logger
+
+# 数据目录
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+OPPORTUNITY_DIR = DATA_DIR / "opportunities"
+
+
+class OpportunityLog:
+    """
+    套利机会历史记录
+    每条记录一个 msgpack map，追加写入 YYYYMMDD.msgpack，按天轮转
+    """
+
+    def __init__(self, dir_path: Path = OPPORTUNITY_DIR):
+        self.dir_path = dir_path
+        self._packer = msgpack.Packer()
+        self._file: Optional[IO[bytes]] = None
+        self._day: Optional[date] = None
+
+    def record(self, pools: list[Pool], source: str) -> None:
+        """
+        追加一批候选池
+
+        Args:
+            pools: 候选池 (已计算指标)
+            source: 来源，"scan" (全量扫描) 或 "signal" (推送触发)
+        """
+        if not pools:
+            return
+
+        ts = time.time_ns() // 1_000_000
+        pack = self._packer.pack
+        chunk = b"".join(
+            pack({
+                "ts": ts,
+                "source": source,
+                "symbol": p.symbol,
+                "funding_rate": float(p.funding_rate),
+                "predicted_rate": float(p.predicted_rate),
+                "price": float(p.price),
+                "volume_24h": float(p.volume_24h),
+                "depth_05pct": float(p.depth_05pct),
+                "spread": float(p.spread),
+                "score": float(p.score or 0),
+            })
+            for p in pools
+        )
+
+        try:
+            # 一批记录一次写入
+            self._current_file().write(chunk)
+        except Exception as e:
+            logger.error(f"写入机会历史失败: {e}")
+
+    def read_day(self, day: Optional[date] = None) -> Iterator[dict]:
+        """读取指定日期的全部记录，默认今天"""
+        path = self._path_for(day or date.today())
+        if not path.exists():
+            return
+
+        with open(path, "rb") as f:
+            yield from msgpack.Unpacker(f, raw=False)
+
+    def close(self) -> None:
+        """关闭当前文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _current_file(self) -> IO[bytes]:
+        """当天的追加句柄，跨天时轮转"""
+        today = date.today()
+        if self._file is None or self._day != today:
+            self.close()
+            self.dir_path.mkdir(parents=True, exist_ok=True)
+            # 无缓冲: 每批记录一次系统调用，进程异常退出也不丢已写记录
+            self._file = open(self._path_for(today), "ab", buffering=0)
+            self._day = today
+        return self._file
+
+    def _path_for(self, day: date) -> Path:
+        return self.dir_path / f"{day:%Y%m%d}.msgpack"
+
+
+# 全局实例
+opportunity_log = OpportunityLog()
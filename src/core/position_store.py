@@ -2,12 +2,14 @@
 核心模块 - 持仓持久化存储
 持仓数据保存到 JSON 文件，支持程序重启恢复
 """
-import json
+import os
 from dataclasses import asdict
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
+
+import orjson
 
 from src.strategy.executor import ArbitragePosition
 from src.utils import logger
@@ -17,33 +19,6 @@ DATA_DIR = Path(__file__).parent.parent.parent / "data"
 POSITIONS_FILE = DATA_DIR / "positions.json"
 
 
-class DecimalEncoder(json.JSONEncoder):
-    """支持 Decimal 的 JSON 编码器"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
-
-def decimal_decoder(dct: dict) -> dict:
-    """JSON 解码时转换 Decimal 字段"""
-    decimal_fields = [
-        "spot_qty", "spot_avg_price", "spot_value",
-        "perp_qty", "perp_avg_price", "perp_value",
-        "funding_earned"
-    ]
-    for field in decimal_fields:
-        if field in dct and dct[field] is not None:
-            dct[field] = Decimal(dct[field])
-    
-    if "opened_at" in dct and dct["opened_at"]:
-        dct["opened_at"] = datetime.fromisoformat(dct["opened_at"])
-    
-    return dct
-
-
 class PositionStore:
     """
     持仓持久化存储
@@ -66,9 +41,38 @@ class PositionStore:
             position: 持仓对象
         """
         positions = self._load_raw()
+        positions[position.symbol] = self._to_dict(position)
+        self._save_raw(positions)
+        
+        logger.debug(f"持仓已保存: {position.symbol}")
+    
+    def save_many(self, positions: Iterable[ArbitragePosition]) -> None:
+        """
+        批量保存持仓 (一次读取、一次写入落盘)
+        
+        Args:
+            positions: 持仓对象列表
+        """
+        raw = self._load_raw()
+        symbols = []
+        for position in positions:
+            raw[position.symbol] = self._to_dict(position)
+            symbols.append(position.symbol)
         
-        # 转换为可序列化格式
-        pos_dict = {
+        if not symbols:
+            return
+        
+        self._save_raw(raw)
+        logger.debug(f"持仓已批量保存: {', '.join(symbols)}")
+    
+    def save_all(self, positions: dict[str, ArbitragePosition]) -> None:
+        """保存所有持仓"""
+        self.save_many(positions.values())
+    
+    @staticmethod
+    def _to_dict(position: ArbitragePosition) -> dict:
+        """转换为可序列化格式"""
+        return {
             "symbol": position.symbol,
             "base_currency": position.base_currency,
             "spot_qty": str(position.spot_qty),
@@ -82,16 +86,6 @@ class PositionStore:
             "opened_at": position.opened_at.isoformat() if position.opened_at else None,
             "funding_periods": position.funding_periods,
         }
-        
-        positions[position.symbol] = pos_dict
-        self._save_raw(positions)
-        
-        logger.debug(f"持仓已保存: {position.symbol}")
-    
-    def save_all(self, positions: dict[str, ArbitragePosition]) -> None:
-        """保存所有持仓"""
-        for position in positions.values():
-            self.save(position)
     
     def load_all(self) -> dict[str, ArbitragePosition]:
         """
@@ -182,17 +176,24 @@ class PositionStore:
             return {}
         
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return orjson.loads(self.file_path.read_bytes())
         except Exception as e:
             logger.error(f"读取持仓文件失败: {e}")
             return {}
     
     def _save_raw(self, data: dict) -> None:
-        """保存原始 JSON 数据"""
+        """
+        保存原始 JSON 数据 (orjson 紧凑序列化)
+        
+        先写临时文件并 fsync，再 os.replace 原子替换，中途崩溃不会留下半截文件
+        """
+        tmp_path = self.file_path.with_suffix(".tmp")
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
         except Exception as e:
             logger.error(f"保存持仓文件失败: {e}")
 
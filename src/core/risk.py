@@ -2,9 +2,11 @@
 核心模块 - 风险控制
 监控持仓风险，执行止损逻辑
 """
+from collections import deque
 from dataclasses import dataclass
 from decimal import Decimal
 from enum import Enum, auto
+from itertools import islice
 from typing import Optional
 
 from src.strategy.executor import ArbitragePosition
@@ -37,11 +39,11 @@ class RiskManager:
     def __init__(self):
         self.risk_cfg = config.risk_config
         
-        # 保证金率阈值
+        # 保证金率阈值 (风控阈值只做比较，用 float；金额累计仍用 Decimal)
         margin_cfg = self.risk_cfg.get("margin_ratio", {})
-        self.margin_warning = Decimal(str(margin_cfg.get("warning", 0.5)))
-        self.margin_danger = Decimal(str(margin_cfg.get("danger", 0.35)))
-        self.margin_close = Decimal(str(margin_cfg.get("close", 0.25)))
+        self.margin_warning = float(margin_cfg.get("warning", 0.5))
+        self.margin_danger = float(margin_cfg.get("danger", 0.35))
+        self.margin_close = float(margin_cfg.get("close", 0.25))
         
         # 亏损阈值
         loss_cfg = self.risk_cfg.get("max_loss", {})
@@ -52,13 +54,17 @@ class RiskManager:
         # 费率反转
         rate_cfg = self.risk_cfg.get("rate_reversal", {})
         self.rate_reversal_periods = rate_cfg.get("watch_periods", 2)
-        self.rate_reversal_threshold = Decimal(str(rate_cfg.get("threshold", 0.0001)))
+        self.rate_reversal_threshold = float(rate_cfg.get("threshold", 0.0001))
         
         # Delta 容忍度
-        self.delta_tolerance = config.delta_tolerance
+        self.delta_tolerance = float(config.delta_tolerance)
         
-        # 费率历史 (用于检测反转)
-        self._rate_history: dict[str, list[Decimal]] = {}
+        # 每次检查都要用的派生阈值，初始化时算好
+        self._rate_reversal_floor = -self.rate_reversal_threshold
+        self._delta_rebalance = self.delta_tolerance * 2
+        
+        # 费率历史 (用于检测反转，定长环形缓冲，追加时自动淘汰最旧一期)
+        self._rate_history: dict[str, deque[float]] = {}
         
         # 统计
         self.daily_loss = Decimal(0)
@@ -106,6 +112,8 @@ class RiskManager:
     
     def _check_margin_ratio(self, margin_ratio: Decimal) -> RiskCheckResult:
         """检查保证金率"""
+        margin_ratio = float(margin_ratio)
+        
         if margin_ratio < self.margin_close:
             return RiskCheckResult(
                 action=RiskAction.CLOSE,
@@ -127,9 +135,9 @@ class RiskManager:
     
     def _check_delta(self, position: ArbitragePosition) -> RiskCheckResult:
         """检查 Delta 偏差"""
-        delta = abs(position.delta)
+        delta = abs(float(position.delta))
         
-        if delta > self.delta_tolerance * 2:
+        if delta > self._delta_rebalance:
             return RiskCheckResult(
                 action=RiskAction.REBALANCE,
                 reason=f"Delta 偏差 {delta:.2%} 超过阈值 {self.delta_tolerance:.2%}",
@@ -147,39 +155,38 @@ class RiskManager:
         current_rate: FundingRate,
     ) -> RiskCheckResult:
         """检查费率反转"""
-        history = self._rate_history.setdefault(symbol, [])
-        history.append(current_rate.rate)
-        
-        # 保留最近 N 期
-        if len(history) > self.rate_reversal_periods + 1:
-            history.pop(0)
+        history = self._rate_history.get(symbol)
+        if history is None:
+            # 保留最近 N+1 期
+            history = self._rate_history[symbol] = deque(maxlen=self.rate_reversal_periods + 1)
+        history.append(float(current_rate.rate))
         
-        if len(history) < self.rate_reversal_periods + 1:
+        if len(history) < history.maxlen:
             return RiskCheckResult(RiskAction.HOLD, "", 0)
         
         # 检测反转
-        # 原来是正费率，现在连续 N 期为负
+        # 原来是正费率，现在连续 N 期为负；任一期未反转即可提前返回
         initial_rate = history[0]
-        recent_rates = history[1:]
+        hold = RiskCheckResult(RiskAction.HOLD, "", 0)
         
         if initial_rate > 0:
             # 正费率套利头寸
-            if all(r < -self.rate_reversal_threshold for r in recent_rates):
-                return RiskCheckResult(
-                    action=RiskAction.CLOSE,
-                    reason=f"费率反转: {format_rate(initial_rate)} → {format_rate(recent_rates[-1])}",
-                    severity=7,
-                )
+            floor = self._rate_reversal_floor
+            for r in islice(history, 1, None):
+                if r >= floor:
+                    return hold
         else:
             # 负费率套利头寸
-            if all(r > self.rate_reversal_threshold for r in recent_rates):
-                return RiskCheckResult(
-                    action=RiskAction.CLOSE,
-                    reason=f"费率反转: {format_rate(initial_rate)} → {format_rate(recent_rates[-1])}",
-                    severity=7,
-                )
+            ceiling = self.rate_reversal_threshold
+            for r in islice(history, 1, None):
+                if r <= ceiling:
+                    return hold
         
-        return RiskCheckResult(RiskAction.HOLD, "", 0)
+        return RiskCheckResult(
+            action=RiskAction.CLOSE,
+            reason=f"费率反转: {format_rate(initial_rate)} → {format_rate(history[-1])}",
+            severity=7,
+        )
     
     def _check_position_loss(self, position: ArbitragePosition) -> RiskCheckResult:
         """检查持仓亏损"""
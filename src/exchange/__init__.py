@@ -1,6 +1,9 @@
 """
 交易所适配层
 """
+import asyncio
+import time
+
 from src.exchange.base import (
     ExchangeBase,
     FundingRate,
@@ -15,6 +18,8 @@ from src.exchange.base import (
 from src.exchange.binance import BinanceAdapter
 from src.exchange.bybit import BybitAdapter
 from src.exchange.okx import OKXAdapter
+from src.exchange.binance_stream import BinanceMarketStream, RateTick, RATE_SCALE
+from src.utils import logger
 
 __all__ = [
     # Base
@@ -31,10 +36,28 @@ __all__ = [
     "BinanceAdapter",
     "BybitAdapter",
     "OKXAdapter",
+    # Streams
+    "BinanceMarketStream",
+    "RateTick",
+    "RATE_SCALE",
     # Factory
     "create_exchange",
+    "get_exchange",
+    "close_exchanges",
+    "warmup",
+    "refresh_markets",
+    "keep_alive",
 ]
 
+# 长时间运行的进程定期刷新市场信息的间隔 (秒)
+MARKETS_REFRESH_INTERVAL = 3600
+# 连接保活间隔 (秒)，小于 aiohttp 默认的 15 秒空闲回收时间
+KEEPALIVE_INTERVAL = 10
+
+
+# 进程内共享的交易所实例 {(name, testnet): adapter}
+_EXCHANGES: dict[tuple[str, bool], ExchangeBase] = {}
+
 
 def create_exchange(name: str, **kwargs) -> ExchangeBase:
     """
@@ -59,3 +82,70 @@ def create_exchange(name: str, **kwargs) -> ExchangeBase:
     
     return adapter_cls(**kwargs)
 
+
+
+def get_exchange(name: str, testnet: bool = True) -> ExchangeBase:
+    """
+    获取进程内共享的交易所适配器 (首次调用时创建)
+    
+    复用同一个 ccxt 客户端，连接池、市场信息和限流状态在调用方之间共享
+    
+    Args:
+        name: 交易所名称 (binance, bybit, okx)
+        testnet: 是否使用测试网
+    
+    Returns:
+        ExchangeBase 实例
+    """
+    key = (name.lower(), testnet)
+    exchange = _EXCHANGES.get(key)
+    if exchange is None:
+        exchange = _EXCHANGES[key] = create_exchange(name, testnet=testnet)
+    return exchange
+
+
+async def close_exchanges() -> None:
+    """关闭所有共享的交易所连接 (进程退出前调用)"""
+    for exchange in _EXCHANGES.values():
+        try:
+            await exchange.close()
+        except Exception as e:
+            logger.warning(f"关闭 {exchange.name} 连接失败: {e}")
+    _EXCHANGES.clear()
+
+
+async def warmup(exchange: ExchangeBase) -> None:
+    """
+    启动时显式加载市场信息 (现货/合约并发)
+    
+    ccxt 第一次调用会隐式 load_markets，耗时 1-3 秒；提前支付避免落在首个交易请求上
+    """
+    start = time.perf_counter()
+    await exchange.load_markets()
+    logger.info(f"{exchange.name} 市场信息已加载 ({time.perf_counter() - start:.2f}s)")
+
+
+async def refresh_markets(exchange: ExchangeBase, interval: float = MARKETS_REFRESH_INTERVAL) -> None:
+    """定期刷新市场信息 (新上线/下架交易对)，以后台任务运行直到被取消"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await exchange.load_markets(reload=True)
+            logger.debug(f"{exchange.name} 市场信息已刷新")
+        except Exception as e:
+            logger.warning(f"刷新 {exchange.name} 市场信息失败: {e}")
+
+
+async def keep_alive(exchange: ExchangeBase, interval: float = KEEPALIVE_INTERVAL) -> None:
+    """
+    定期发送轻量请求保持 HTTP 连接，以后台任务运行直到被取消
+    
+    ccxt 每个客户端复用一个 aiohttp 连接池，但空闲 15 秒后连接被回收；
+    低频交易时下单请求会重新 DNS + TCP + TLS 握手 (~100ms)，保活让下单直接复用已有连接
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await exchange.ping()
+        except Exception as e:
+            logger.debug(f"{exchange.name} 连接保活失败: {e}")
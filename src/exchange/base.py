@@ -248,6 +248,18 @@ class ExchangeBase(ABC):
         """关闭连接"""
         pass
     
+    async def load_markets(self, reload: bool = False) -> None:
+        """加载市场信息 (ccxt 首次调用时会隐式加载，启动时显式预热可避免首单延迟)"""
+        pass
+    
+    async def ping(self) -> None:
+        """轻量请求 (服务器时间)，保持 HTTP 连接不因空闲被回收"""
+        pass
+    
+    def get_amount_step(self, symbol: str) -> Optional[Decimal]:
+        """获取下单数量步长 (未实现或市场信息未加载时返回 None)"""
+        return None
+    
     def spot_symbol(self, base: str, quote: str = "USDT") -> str:
         """构建现货交易对名称"""
         return f"{base}/{quote}"
@@ -1,11 +1,13 @@
 """
 Binance 交易所适配器
 """
+import asyncio
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
 import ccxt.async_support as ccxt
+from ccxt.base.decimal_to_precision import TICK_SIZE
 
 from src.exchange.base import (
     ExchangeBase,
@@ -378,6 +380,33 @@ class BinanceAdapter(ExchangeBase):
     
     # ==================== 工具方法 ====================
     
+    def get_amount_step(self, symbol: str) -> Optional[Decimal]:
+        """获取下单数量步长 (BTC/USDT 取现货市场，BTC/USDT:USDT 取合约市场)"""
+        client = self.perp if ":" in symbol else self.spot
+        market = (client.markets or {}).get(symbol)
+        if not market:
+            return None
+        
+        precision = market.get("precision", {}).get("amount")
+        if precision is None:
+            return None
+        
+        # TICK_SIZE 模式下 precision 为步长本身，否则为小数位数
+        if client.precisionMode == TICK_SIZE:
+            return Decimal(str(precision))
+        return Decimal(1).scaleb(-int(precision))
+    
+    async def load_markets(self, reload: bool = False) -> None:
+        """并发加载现货与合约市场信息"""
+        await asyncio.gather(
+            self.spot.load_markets(reload),
+            self.perp.load_markets(reload),
+        )
+    
+    async def ping(self) -> None:
+        """请求现货与合约服务器时间 (权重 1)，保持两个域名的连接"""
+        await asyncio.gather(self.spot.fetch_time(), self.perp.fetch_time())
+    
     async def close(self) -> None:
         """关闭连接"""
         await self.spot.close()
@@ -0,0 +1,195 @@
+"""
+Binance 行情推送 (WebSocket)
+订阅 U 本位合约全市场标记价格/资金费率与最优挂单，替代 REST 轮询
+"""
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, NamedTuple, Optional
+
+import orjson
+import websockets
+
+from src.exchange.base import FundingRate
+from src.utils import logger
+
+# markPrice@arr@1s: 每秒推送全市场标记价格 + 资金费率 + 下次结算时间
+# bookTicker: 全市场最优买卖价实时推送
+STREAM_URL = "wss://fstream.binance.com/stream?streams=!markPrice@arr@1s/!bookTicker"
+
+# 费率定点精度 (Binance 费率最多 8 位小数)，热路径上用整数比较代替 Decimal
+RATE_SCALE = 10 ** 8
+
+# 接收队列上限 (帧数): 消费端卡顿时 bookTicker 积压有界，满了暂停读取而不是无限占用内存
+STREAM_MAX_QUEUE = 2 ** 14
+
+
+class RateTick(NamedTuple):
+    """单个交易对的费率推送 (整数费率，Decimal 按需构造)"""
+    symbol: str
+    ticks: int              # 费率 * RATE_SCALE
+    raw: str                # 原始费率字符串
+    next_funding_ms: int    # 下次结算时间 (ms)
+    
+    def to_funding_rate(self) -> FundingRate:
+        """转换为 FundingRate (仅在需要精确值时调用)"""
+        now = datetime.now()
+        rate = Decimal(self.raw)
+        return FundingRate(
+            symbol=self.symbol,
+            rate=rate,
+            predicted_rate=rate,
+            next_funding_time=datetime.fromtimestamp(self.next_funding_ms / 1000)
+            if self.next_funding_ms else now,
+            timestamp=now,
+        )
+
+
+RatesHandler = Callable[[list[RateTick]], None]
+BookHandler = Callable[[str, str, str], None]
+
+
+class BinanceMarketStream:
+    """
+    Binance 合约行情推送
+    回调在接收循环内同步执行，回调内不应 await 网络请求 (需要时自行 create_task)
+    """
+
+    def __init__(
+        self,
+        on_rates: Optional[RatesHandler] = None,
+        on_book: Optional[BookHandler] = None,
+        url: str = STREAM_URL,
+        reconnect_delay: float = 5.0,
+    ):
+        """
+        Args:
+            on_rates: 资金费率批量更新回调 (每秒一次，全市场)
+            on_book: 最优挂单更新回调 (symbol, bid, ask)，价格为原始字符串
+            url: 组合流地址
+            reconnect_delay: 断线重连间隔 (秒)
+        """
+        self.on_rates = on_rates
+        self.on_book = on_book
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.running = False
+        # 当前连接 (stop() 时主动关闭，打断阻塞中的 recv)
+        self._ws = None
+        
+        # 交易所 ID -> 统一格式的映射缓存 (非 USDT 永续缓存为 None)，避免每条推送重复拼接字符串
+        self._symbols: dict[str, Optional[str]] = {}
+
+    async def run(self) -> None:
+        """连接并持续消费推送，断线自动重连"""
+        self.running = True
+
+        while self.running:
+            try:
+                # 关闭压缩；接收队列设较大的上限，突发行情不致暂停读取，消费端卡顿时积压仍有界
+                # 全市场 markPrice 数组约 100KB，单帧上限 1MB
+                async with websockets.connect(
+                    self.url,
+                    max_size=2 ** 20,
+                    max_queue=STREAM_MAX_QUEUE,
+                    compression=None,
+                ) as ws:
+                    self._ws = ws
+                    logger.info("Binance 行情推送已连接")
+                    while True:
+                        # 推送为 ASCII JSON，直接取 bytes 交给 orjson，跳过 UTF-8 解码
+                        message = await ws.recv(decode=False)
+                        self._dispatch(orjson.loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self.running:
+                    break
+                logger.warning(f"Binance 行情推送断开: {e}，{self.reconnect_delay:.0f} 秒后重连")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                self._ws = None
+
+        logger.info("Binance 行情推送已停止")
+
+    def stop(self) -> None:
+        """停止推送并关闭当前连接 (阻塞在 recv 的接收循环随即退出)"""
+        self.running = False
+        ws, self._ws = self._ws, None
+        if ws is None:
+            return
+        try:
+            asyncio.get_running_loop().create_task(ws.close())
+        except RuntimeError:
+            # 不在事件循环中调用: 只能等接收循环收到下一条消息后退出
+            pass
+
+    # ==================== 消息解析 ====================
+
+    def _dispatch(self, payload: dict) -> None:
+        """按流名称分发消息"""
+        stream = payload.get("stream", "")
+        data = payload.get("data")
+        if data is None:
+            return
+
+        try:
+            if stream.startswith("!markPrice"):
+                self._handle_mark_prices(data)
+            elif stream == "!bookTicker":
+                self._handle_book_ticker(data)
+        except Exception as e:
+            logger.error(f"处理行情推送失败 {stream}: {e}")
+
+    def _handle_mark_prices(self, items: list[dict]) -> None:
+        """markPriceUpdate: {s: 交易对, r: 资金费率, T: 下次结算时间(ms)}"""
+        if not self.on_rates:
+            return
+
+        unified = self._unified_symbol
+        ticks = []
+        for item in items:
+            symbol = unified(item["s"])
+            raw_rate = item.get("r")
+            # 交割合约等没有资金费率
+            if symbol is None or not raw_rate:
+                continue
+
+            ticks.append(RateTick(
+                symbol,
+                round(float(raw_rate) * RATE_SCALE),
+                raw_rate,
+                item.get("T") or 0,
+            ))
+
+        if ticks:
+            self.on_rates(ticks)
+
+    def _handle_book_ticker(self, data: dict) -> None:
+        """bookTicker: {s: 交易对, b: 买一价, a: 卖一价}"""
+        if not self.on_book:
+            return
+
+        symbol = self._unified_symbol(data["s"])
+        if symbol is None:
+            return
+
+        # 推送频率极高，这里不做数值转换，由使用方按需转换
+        self.on_book(symbol, data["b"], data["a"])
+
+    def _unified_symbol(self, market_id: str) -> Optional[str]:
+        """
+        交易所 ID 转换为 ccxt 统一格式 (结果缓存)
+        BTCUSDT -> BTC/USDT:USDT，非 USDT 永续 (交割合约/USDC 本位) 返回 None
+        """
+        try:
+            return self._symbols[market_id]
+        except KeyError:
+            pass
+        
+        if "_" in market_id or not market_id.endswith("USDT"):
+            symbol = None
+        else:
+            symbol = f"{market_id[:-4]}/USDT:USDT"
+        self._symbols[market_id] = symbol
+        return symbol
@@ -286,6 +286,14 @@ class BybitAdapter(ExchangeBase):
     
     # ==================== 工具方法 ====================
     
+    async def load_markets(self, reload: bool = False) -> None:
+        """加载市场信息"""
+        await self.client.load_markets(reload)
+    
+    async def ping(self) -> None:
+        """请求服务器时间，保持连接"""
+        await self.client.fetch_time()
+    
     async def close(self) -> None:
         """关闭连接"""
         await self.client.close()
@@ -97,7 +97,7 @@ class Executor:
     async def open_arbitrage(
         self,
         pool: Pool,
-        size_usdt: Decimal,
+        size_usdt: Decimal | float,
     ) -> Optional[ArbitragePosition]:
         """
         开启套利头寸
@@ -107,18 +107,24 @@ class Executor:
         
         Args:
             pool: 目标池子
-            size_usdt: 头寸大小 (USDT)
+            size_usdt: 头寸大小 (USDT)，float 只在这里转换一次，用于按步长取整下单数量
             
         Returns:
             套利持仓对象
         """
+        if isinstance(size_usdt, float):
+            size_usdt = Decimal(str(size_usdt))
+        
         symbol = pool.symbol
         base = pool.base_currency
         spot_symbol = f"{base}/USDT"
         perp_symbol = symbol  # 已经是 BTC/USDT:USDT 格式
         
-        # 计算下单数量
-        qty = size_usdt / pool.price
+        # 计算下单数量 (两边按同一步长取整，保证对冲数量一致)
+        qty = self._hedge_qty(spot_symbol, perp_symbol, size_usdt / pool.price)
+        if qty <= 0:
+            logger.warning(f"开仓金额 {format_usdt(size_usdt)} 低于 {symbol} 最小下单步长，跳过")
+            return None
         
         logger.info(
             f"开始开仓 {symbol}: "
@@ -238,6 +244,26 @@ class Executor:
             logger.error(f"开仓失败 {symbol}: {e}")
             return None
     
+    def _hedge_qty(self, spot_symbol: str, perp_symbol: str, qty: Decimal) -> Decimal:
+        """
+        按现货/合约数量步长中较粗的一个向下取整
+        
+        在步长单位下做整数运算，只在这里转换一次；两边提交相同数量，
+        避免各自由交易所截断精度后产生 Delta 偏差
+        """
+        steps = [
+            step for step in (
+                self.exchange.get_amount_step(spot_symbol),
+                self.exchange.get_amount_step(perp_symbol),
+            )
+            if step
+        ]
+        if not steps:
+            return qty
+        
+        step = max(steps)
+        return step * int(qty / step)
+    
     async def close_arbitrage(
         self,
         symbol: str,
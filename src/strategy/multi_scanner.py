@@ -65,11 +65,13 @@ class MultiExchangeScanner:
         self,
         exchanges: list[str] = None,
         testnet: bool = True,
+        max_concurrency: int = 16,
     ):
         """
         Args:
             exchanges: 要扫描的交易所列表，默认全部
             testnet: 是否使用测试网
+            max_concurrency: 每个交易所的订单簿请求并发上限
         """
         self.exchange_names = exchanges or ["binance", "bybit", "okx"]
         self.testnet = testnet
@@ -78,6 +80,11 @@ class MultiExchangeScanner:
         # 交易所适配器 (延迟初始化)
         self._exchanges: dict[str, ExchangeBase] = {}
         
+        # 订单簿请求并发上限 (每个交易所独立，各自的限流互不挤占)
+        self._semaphores = {
+            name: asyncio.Semaphore(max_concurrency) for name in self.exchange_names
+        }
+        
         logger.info(f"多交易所扫描器初始化: {self.exchange_names}")
     
     async def _get_exchange(self, name: str) -> ExchangeBase:
@@ -97,8 +104,11 @@ class MultiExchangeScanner:
             exchange = await self._get_exchange(name)
             logger.info(f"[{name.upper()}] 开始扫描...")
             
-            # 1. 获取资金费率
-            rates = await exchange.get_funding_rates()
+            # 1. 资金费率与行情互不依赖，并发获取
+            rates, tickers = await asyncio.gather(
+                exchange.get_funding_rates(),
+                exchange.get_tickers(),
+            )
             rate_map = {r.symbol: r for r in rates}
             
             # 找出高费率交易对
@@ -114,18 +124,18 @@ class MultiExchangeScanner:
             
             logger.info(f"[{name.upper()}] 高费率交易对: {len(high_rate_symbols)} 个")
             
-            # 2. 获取行情数据
-            tickers = await exchange.get_tickers()
+            # 2. 行情数据
             ticker_map = {t.symbol: t for t in tickers}
             
-            # 3. 获取订单簿并构建 Pool
-            opportunities = []
-            for symbol in high_rate_symbols[:50]:  # 限制数量避免过多请求
-                if symbol not in ticker_map:
-                    continue
-                
+            # 3. 并发获取订单簿并构建 Pool
+            targets = [s for s in high_rate_symbols[:50] if s in ticker_map]  # 限制数量避免过多请求
+            semaphore = self._semaphores[name]
+            
+            async def fetch_opportunity(symbol: str) -> Optional[ArbitrageOpportunity]:
+                # 信号量只限制订单簿请求；整个处理过程都在 try 内，单个交易对出错只跳过它自己
                 try:
-                    orderbook = await exchange.get_orderbook(symbol)
+                    async with semaphore:
+                        orderbook = await exchange.get_orderbook(symbol)
                     
                     pool = Pool.from_data(
                         rate=rate_map[symbol],
@@ -134,20 +144,21 @@ class MultiExchangeScanner:
                     )
                     
                     # 应用筛选条件
-                    if self._filter_pool(pool):
-                        self.selector._calc_metrics(pool)
-                        opp = ArbitrageOpportunity.from_pool(
-                            pool, 
-                            name,
-                            rate_map[symbol].next_funding_time,
-                        )
-                        opportunities.append(opp)
-                    
-                    await asyncio.sleep(0.05)  # 避免限流
+                    if not self._filter_pool(pool):
+                        return None
                     
+                    self.selector._calc_metrics(pool)
+                    return ArbitrageOpportunity.from_pool(
+                        pool, 
+                        name,
+                        rate_map[symbol].next_funding_time,
+                    )
                 except Exception as e:
                     logger.debug(f"[{name.upper()}] {symbol} 获取失败: {e}")
-                    continue
+                    return None
+            
+            results = await asyncio.gather(*(fetch_opportunity(s) for s in targets))
+            opportunities = [opp for opp in results if opp is not None]
             
             logger.info(f"[{name.upper()}] 发现 {len(opportunities)} 个符合条件的机会")
             return opportunities
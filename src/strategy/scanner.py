@@ -3,12 +3,18 @@
 定时扫描所有交易对，获取资金费率和行情数据
 """
 import asyncio
+from decimal import Decimal
 from typing import Optional
 
+import numpy as np
+
 from src.exchange import ExchangeBase, FundingRate, Ticker, OrderBook
 from src.strategy.selector import Pool, PoolSelector
 from src.utils import logger, config, format_rate
 
+# 订单簿并发请求上限
+SCAN_CONCURRENCY = 16
+
 
 class Scanner:
     """
@@ -22,8 +28,14 @@ class Scanner:
         
         # 缓存
         self._rates: dict[str, FundingRate] = {}
+        # 费率列式缓存: 交易对与 float 费率两列按下标对齐，过滤/排序在 numpy 中完成
+        self._rate_symbols: list[str] = []
+        self._rate_index: dict[str, int] = {}
+        self._rate_values = np.empty(0, dtype=np.float64)
         self._tickers: dict[str, Ticker] = {}
         self._orderbooks: dict[str, OrderBook] = {}
+        # 推送的最优挂单 {symbol: (买一价, 卖一价)}，保留原始字符串按需转换
+        self._books: dict[str, tuple[str, str]] = {}
     
     async def scan(self, symbols: Optional[list[str]] = None) -> list[Pool]:
         """
@@ -39,14 +51,15 @@ class Scanner:
         
         # 1. 获取资金费率
         rates = await self.exchange.get_funding_rates()
-        self._rates = {r.symbol: r for r in rates}
+        self._set_rates(rates)
         logger.info(f"获取 {len(rates)} 个交易对的资金费率")
         
-        # 找出高费率交易对
-        high_rate_symbols = [
-            r.symbol for r in rates
-            if abs(r.rate) >= config.min_funding_rate
-        ]
+        # 找出高费率交易对 (整列向量化比较)
+        mask = np.abs(self._rate_values) >= float(config.min_funding_rate)
+        high_rate_symbols = [self._rate_symbols[i] for i in np.flatnonzero(mask)]
+        if symbols is not None:
+            wanted = set(symbols)
+            high_rate_symbols = [s for s in high_rate_symbols if s in wanted]
         logger.info(f"高费率交易对: {len(high_rate_symbols)} 个")
         
         if not high_rate_symbols:
@@ -66,7 +79,7 @@ class Scanner:
                     logger.warning(f"加载现货市场失败: {e}")
 
         # 3. 获取订单簿 (只获取高费率交易对)
-        pools = []
+        targets = []
         for symbol in high_rate_symbols:
             if symbol not in self._tickers:
                 continue
@@ -82,22 +95,28 @@ class Scanner:
                     # logger.warning(f"跳过 {symbol}: 现货 {spot_symbol} 不存在")
                     continue
             
-            try:
-                orderbook = await self.exchange.get_orderbook(symbol)
-                self._orderbooks[symbol] = orderbook
-                
-                pool = Pool.from_data(
-                    rate=self._rates[symbol],
-                    ticker=self._tickers[symbol],
-                    orderbook=orderbook,
-                )
-                pools.append(pool)
-            except Exception as e:
-                logger.warning(f"获取 {symbol} 订单簿失败: {e}")
-                continue
+            targets.append(symbol)
+        
+        # 并发获取订单簿，信号量限制同时在途请求数 (ccxt 自身限流仍然生效)
+        semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+        
+        async def fetch_pool(symbol: str) -> Optional[Pool]:
+            async with semaphore:
+                try:
+                    orderbook = await self.exchange.get_orderbook(symbol)
+                except Exception as e:
+                    logger.warning(f"获取 {symbol} 订单簿失败: {e}")
+                    return None
             
-            # 避免触发限流
-            await asyncio.sleep(0.1)
+            self._orderbooks[symbol] = orderbook
+            return Pool.from_data(
+                rate=self._rates[symbol],
+                ticker=self._tickers[symbol],
+                orderbook=orderbook,
+            )
+        
+        results = await asyncio.gather(*(fetch_pool(s) for s in targets))
+        pools = [pool for pool in results if pool is not None]
         
         logger.info(f"构建 {len(pools)} 个池子数据")
         
@@ -117,9 +136,12 @@ class Scanner:
     async def scan_single(self, symbol: str) -> Optional[Pool]:
         """扫描单个交易对"""
         try:
-            rate = await self.exchange.get_funding_rate(symbol)
-            ticker = await self.exchange.get_ticker(symbol)
-            orderbook = await self.exchange.get_orderbook(symbol)
+            # 优先使用推送/扫描缓存的费率
+            rate = self._rates.get(symbol) or await self.exchange.get_funding_rate(symbol)
+            ticker, orderbook = await asyncio.gather(
+                self.exchange.get_ticker(symbol),
+                self.exchange.get_orderbook(symbol),
+            )
             
             pool = Pool.from_data(rate, ticker, orderbook)
             self.selector._calc_metrics(pool)
@@ -129,15 +151,85 @@ class Scanner:
             logger.error(f"扫描 {symbol} 失败: {e}")
             return None
     
+    async def scan_symbols(self, symbols: list[str]) -> list[Pool]:
+        """
+        并发扫描指定交易对 (信号量限制在途请求数)
+        
+        单个交易对失败只记录日志，不影响其余结果
+        """
+        semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+        
+        async def scan_one(symbol: str) -> Optional[Pool]:
+            async with semaphore:
+                return await self.scan_single(symbol)
+        
+        results = await asyncio.gather(*(scan_one(s) for s in symbols), return_exceptions=True)
+        pools = []
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"扫描 {symbol} 异常: {result}")
+            elif result is not None:
+                pools.append(result)
+        return pools
+    
     def get_cached_rate(self, symbol: str) -> Optional[FundingRate]:
         """获取缓存的资金费率"""
         return self._rates.get(symbol)
     
+    def get_cached_rates(self, symbols: list[str]) -> list[Optional[FundingRate]]:
+        """批量获取缓存的资金费率 (与 symbols 逐项对齐，无缓存为 None)"""
+        rates = self._rates
+        return [rates.get(symbol) for symbol in symbols]
+    
+    def update_rate(self, rate: FundingRate) -> None:
+        """更新费率缓存 (行情推送)，只改对应一行"""
+        symbol = rate.symbol
+        self._rates[symbol] = rate
+        
+        i = self._rate_index.get(symbol)
+        if i is not None:
+            self._rate_values[i] = float(rate.rate)
+        else:
+            # 新交易对 (扫描后上线)，追加一行
+            self._rate_index[symbol] = len(self._rate_symbols)
+            self._rate_symbols.append(symbol)
+            self._rate_values = np.append(self._rate_values, float(rate.rate))
+    
+    def _set_rates(self, rates: list[FundingRate]) -> None:
+        """全量替换费率缓存 (一次批量请求后重建列)"""
+        self._rates = {r.symbol: r for r in rates}
+        self._rate_symbols = list(self._rates)
+        self._rate_index = {symbol: i for i, symbol in enumerate(self._rate_symbols)}
+        self._rate_values = np.fromiter(
+            (float(r.rate) for r in self._rates.values()),
+            dtype=np.float64,
+            count=len(self._rates),
+        )
+    
+    def update_book(self, symbol: str, bid: str, ask: str) -> None:
+        """更新最优挂单缓存 (行情推送)"""
+        self._books[symbol] = (bid, ask)
+    
+    def get_cached_spread(self, symbol: str) -> Optional[Decimal]:
+        """根据推送的最优挂单计算买卖价差"""
+        book = self._books.get(symbol)
+        if not book:
+            return None
+        bid, ask = Decimal(book[0]), Decimal(book[1])
+        if not bid:
+            return None
+        return (ask - bid) / bid
+    
     def get_top_rates(self, n: int = 10) -> list[FundingRate]:
         """获取费率最高的 N 个交易对"""
-        rates = list(self._rates.values())
-        rates.sort(key=lambda x: abs(x.rate), reverse=True)
-        return rates[:n]
+        abs_rates = np.abs(self._rate_values)
+        if len(abs_rates) <= n:
+            top = np.argsort(-abs_rates, kind="stable")
+        else:
+            # 全市场数百个交易对只取前 N: argpartition O(n) 选出，再对 N 个排序
+            top = np.argpartition(-abs_rates, n)[:n]
+            top = top[np.argsort(-abs_rates[top])]
+        return [self._rates[self._rate_symbols[i]] for i in top]
     
     def print_rate_summary(self) -> None:
         """打印费率摘要"""
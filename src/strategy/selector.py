@@ -2,10 +2,12 @@
 策略模块 - 池子筛选器
 核心竞争力：精准筛选中低流动性池，避开大资金竞争
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Optional
 
+import numpy as np
+
 from src.exchange import FundingRate, Ticker, OrderBook
 from src.utils import config, logger, format_rate, format_usdt, estimate_profit
 
@@ -30,6 +32,11 @@ class Pool:
     expected_profit: Optional[Decimal] = None
     breakeven_periods: Optional[int] = None
     score: Optional[Decimal] = None
+    # 费率绝对值 (float，热路径比较/排序用，Decimal 只留给交易所接口和展示)
+    abs_rate: float = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.abs_rate = abs(float(self.funding_rate))
     
     @classmethod
     def from_data(
@@ -102,33 +109,37 @@ class PoolSelector:
         Returns:
             按预期收益排序的候选池列表
         """
-        candidates = []
+        if not pools:
+            logger.info("筛选结果: 0/0 个池子通过筛选")
+            return []
         
-        for pool in pools:
-            # 1. 黑名单检查
+        # 数值条件按列 (SoA) 一次性向量化判断，只对通过的池子计算指标
+        rates = np.array([float(p.funding_rate) for p in pools])
+        volumes = np.array([float(p.volume_24h) for p in pools])
+        depths = np.array([float(p.depth_05pct) for p in pools])
+        spreads = np.array([float(p.spread) for p in pools])
+        
+        mask = (
+            # 流动性窗口检查 (核心筛选)
+            (volumes >= float(self.min_volume)) & (volumes <= float(self.max_volume))
+            # 深度检查
+            & (depths >= float(self.min_depth))
+            # 费率门槛
+            & (np.abs(rates) >= float(self.min_rate))
+            # 价差检查
+            & (spreads <= float(self.max_spread))
+        )
+        # 负费率检查
+        if not config.allow_negative_rates:
+            mask &= rates >= 0
+        
+        candidates = []
+        for i in np.flatnonzero(mask):
+            pool = pools[i]
+            # 黑名单检查
             if pool.base_currency in self.blacklist:
                 continue
             
-            # 2. 负费率检查
-            if not config.allow_negative_rates and pool.funding_rate < 0:
-                continue
-            
-            # 3. 流动性窗口检查 (核心筛选)
-            if not (self.min_volume <= pool.volume_24h <= self.max_volume):
-                continue
-            
-            # 3. 深度检查
-            if pool.depth_05pct < self.min_depth:
-                continue
-            
-            # 4. 费率门槛
-            if abs(pool.funding_rate) < self.min_rate:
-                continue
-            
-            # 5. 价差检查
-            if pool.spread > self.max_spread:
-                continue
-            
             # 计算预期收益
             self._calc_metrics(pool)
             candidates.append(pool)
@@ -12,6 +12,7 @@ from src.utils.helpers import (
     format_delta,
     estimate_profit,
     breakeven_periods,
+    install_uvloop,
 )
 from src.utils.notify import TelegramNotifier, telegram
 
@@ -32,6 +33,7 @@ __all__ = [
     "format_delta",
     "estimate_profit",
     "breakeven_periods",
+    "install_uvloop",
     # Notification
     "TelegramNotifier",
     "telegram",
@@ -3,6 +3,7 @@
 """
 from datetime import datetime, time, timedelta
 from decimal import Decimal, ROUND_DOWN
+from functools import lru_cache
 from typing import Optional
 
 import pytz
@@ -89,20 +90,28 @@ def time_to_next_funding(now: Optional[datetime] = None) -> int:
     return int(delta.total_seconds())
 
 
+# format_usdt 常用精度的量化步长
+_USDT_QUANTA = {d: Decimal(10) ** -d for d in range(9)}
+
+
 def format_usdt(amount: Decimal | float, decimals: int = 2) -> str:
     """格式化 USDT 金额"""
     if isinstance(amount, float):
         amount = Decimal(str(amount))
-    return f"${amount.quantize(Decimal(10) ** -decimals, rounding=ROUND_DOWN):,}"
+    quantum = _USDT_QUANTA.get(decimals) or Decimal(10) ** -decimals
+    return f"${amount.quantize(quantum, rounding=ROUND_DOWN):,}"
 
 
+@lru_cache(maxsize=4096)
 def format_rate(rate: Decimal | float) -> str:
-    """格式化资金费率为百分比"""
-    if isinstance(rate, float):
-        rate = Decimal(str(rate))
-    pct = rate * 100
-    sign = "+" if rate > 0 else ""
-    return f"{sign}{pct:.4f}%"
+    """
+    格式化资金费率为百分比
+    
+    费率取值离散且重复出现 (每期同一交易对的费率、批量播报)，按值缓存结果；
+    仅用于展示，转为 float 后一次格式化，不走 Decimal 运算
+    """
+    pct = float(rate) * 100
+    return f"{pct:+.4f}%" if rate > 0 else f"{pct:.4f}%"
 
 
 def format_delta(delta: Decimal) -> str:
@@ -171,3 +180,20 @@ def breakeven_periods(
     # 向上取整
     import math
     return math.ceil(float(periods))
+
+
+def install_uvloop() -> bool:
+    """
+    安装 uvloop 事件循环策略 (在 asyncio.run 之前调用)
+    
+    uvloop 加速推送/REST 的 socket I/O；未安装或 Windows 不支持时回退标准事件循环
+    
+    Returns:
+        是否已启用 uvloop
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    uvloop.install()
+    return True
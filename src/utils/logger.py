@@ -9,8 +9,17 @@ from loguru import logger
 from src.utils.config import config, ROOT_DIR
 
 
+# 是否已配置 (重复调用时跳过，避免反复重建控制台/文件 handler)
+_configured = False
+
+
 def setup_logger() -> None:
-    """配置日志系统"""
+    """配置日志系统 (幂等，只在首次调用时生效)"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    
     # 移除默认 handler
     logger.remove()
     
@@ -4,12 +4,50 @@
 """
 import asyncio
 import aiohttp
+import orjson
 from decimal import Decimal
 from typing import Optional
 from datetime import datetime
 
 from src.utils import logger, config
 
+# 队列消息合并窗口 (秒) 与单条消息长度上限
+BATCH_WINDOW = 1.0
+MAX_MESSAGE_LEN = 4096
+# 单次请求超时 (秒)
+REQUEST_TIMEOUT = 10
+# 队列停止标记: 后台任务取到后发送完已取出的消息再退出
+_STOP = object()
+
+
+def _json_dumps(obj) -> str:
+    """orjson 序列化 (aiohttp 需要 str)"""
+    return orjson.dumps(obj).decode()
+
+
+def _split_message(text: str) -> list[str]:
+    """超过长度上限的单条消息按行切分 (单行仍超长时硬切)，Telegram 拒收超长消息"""
+    if len(text) <= MAX_MESSAGE_LEN:
+        return [text]
+    
+    parts = []
+    chunk = ""
+    for line in text.split("\n"):
+        while len(line) > MAX_MESSAGE_LEN:
+            if chunk:
+                parts.append(chunk)
+                chunk = ""
+            parts.append(line[:MAX_MESSAGE_LEN])
+            line = line[MAX_MESSAGE_LEN:]
+        if chunk and len(chunk) + len(line) + 1 > MAX_MESSAGE_LEN:
+            parts.append(chunk)
+            chunk = ""
+        chunk = f"{chunk}\n{line}" if chunk else line
+    
+    if chunk:
+        parts.append(chunk)
+    return parts
+
 
 class TelegramNotifier:
     """
@@ -27,6 +65,13 @@ class TelegramNotifier:
         self.chat_id = chat_id or config.telegram_chat_id
         self.enabled = bool(self.token and self.chat_id)
         
+        # 异步发送队列 (首次入队时创建，后台任务合并发送)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        
+        # HTTP 会话 (首次发送时创建，之后所有消息复用同一个连接池)
+        self._session: Optional[aiohttp.ClientSession] = None
+        
         if not self.enabled:
             logger.warning("Telegram 通知未配置，请设置 TELEGRAM_TOKEN 和 TELEGRAM_CHAT_ID")
     
@@ -34,43 +79,122 @@ class TelegramNotifier:
     def api_url(self) -> str:
         return f"https://api.telegram.org/bot{self.token}"
     
-    async def send_message(self, text: str, parse_mode: str = "HTML") -> bool:
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享的 HTTP 会话 (连接保持，避免每条消息重新 TLS 握手)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                json_serialize=_json_dumps,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
+            )
+        return self._session
+    
+    async def send_message(self, text: str, parse_mode: str = "HTML", wait: bool = True) -> bool:
         """
         发送消息
         
         Args:
             text: 消息内容 (支持 HTML/Markdown)
             parse_mode: 解析模式 (HTML 或 Markdown)
+            wait: False 时放入发送队列立即返回 (仅支持 HTML)，交易决策路径使用
             
         Returns:
-            是否发送成功
+            是否发送成功 (入队时返回是否入队成功)
         """
         if not self.enabled:
             logger.debug(f"[Telegram] 未启用，消息: {text[:50]}...")
             return False
         
+        if not wait and parse_mode == "HTML":
+            return self.enqueue(text)
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.api_url}/sendMessage"
-                data = {
-                    "chat_id": self.chat_id,
-                    "text": text,
-                    "parse_mode": parse_mode,
-                }
-                
-                async with session.post(url, json=data) as resp:
-                    if resp.status == 200:
-                        logger.debug(f"[Telegram] 消息发送成功")
-                        return True
-                    else:
-                        error = await resp.text()
-                        logger.error(f"[Telegram] 发送失败: {error}")
-                        return False
-                        
+            url = f"{self.api_url}/sendMessage"
+            data = {
+                "chat_id": self.chat_id,
+                "text": text,
+                "parse_mode": parse_mode,
+            }
+            
+            async with self._get_session().post(url, json=data) as resp:
+                if resp.status == 200:
+                    logger.debug(f"[Telegram] 消息发送成功")
+                    return True
+                else:
+                    error = await resp.text()
+                    logger.error(f"[Telegram] 发送失败: {error}")
+                    return False
+                    
         except Exception as e:
             logger.error(f"[Telegram] 发送异常: {e}")
             return False
     
+    def enqueue(self, text: str) -> bool:
+        """放入发送队列，不等待网络请求"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=1024)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain_queue())
+        
+        try:
+            self._queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"[Telegram] 发送队列已满，丢弃消息: {text[:50]}...")
+            return False
+    
+    async def flush(self) -> None:
+        """发送队列中剩余的消息并停止后台任务 (退出前调用)"""
+        if self._queue is None:
+            return
+        
+        # 放入停止标记并等待后台任务退出: 它正在发送的那一批会发完，不会被取消丢弃
+        if self._worker is not None and not self._worker.done():
+            await self._queue.put(_STOP)
+            await self._worker
+        self._worker = None
+        
+        # 后台任务已异常退出时，剩余消息在这里补发
+        await self._send_batch(self._take_pending([]))
+    
+    async def close(self) -> None:
+        """发送剩余消息并关闭 HTTP 会话 (退出前调用)"""
+        await self.flush()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def _drain_queue(self) -> None:
+        """后台任务: 合并窗口内的所有消息后一次发送，取到停止标记时发完本批后退出"""
+        while True:
+            first = await self._queue.get()
+            if first is not _STOP:
+                await asyncio.sleep(BATCH_WINDOW)
+            
+            batch = self._take_pending([first])
+            messages = [text for text in batch if text is not _STOP]
+            await self._send_batch(messages)
+            if len(messages) < len(batch):
+                return
+    
+    def _take_pending(self, messages: list[str]) -> list[str]:
+        """取出队列中已有的全部消息"""
+        while not self._queue.empty():
+            messages.append(self._queue.get_nowait())
+        return messages
+    
+    async def _send_batch(self, messages: list[str]) -> None:
+        """按长度上限拼接消息后发送"""
+        chunk = ""
+        for text in (part for message in messages for part in _split_message(message)):
+            if chunk and len(chunk) + len(text) + 2 > MAX_MESSAGE_LEN:
+                await self.send_message(chunk)
+                chunk = ""
+            chunk = f"{chunk}\n\n{text}" if chunk else text
+        
+        if chunk:
+            await self.send_message(chunk)
+    
     async def notify_opportunity(
         self,
         exchange: str,
@@ -110,9 +234,11 @@ class TelegramNotifier:
         perp_qty: Decimal,
         perp_price: Decimal,
         pnl: Decimal = None,
+        details: str = None,
+        wait: bool = True,
     ) -> bool:
         """
-        发送交易通知
+        发送交易通知 (details 附加在同一条消息中)
         """
         emoji = "🟢" if action == "开仓" else "🔴"
         
@@ -127,9 +253,12 @@ class TelegramNotifier:
             pnl_emoji = "💰" if pnl >= 0 else "💸"
             text += f"盈亏: {pnl_emoji} <code>${pnl:+.2f}</code>\n"
         
+        if details:
+            text += f"\n{details}"
+        
         text += f"\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         
-        return await self.send_message(text)
+        return await self.send_message(text, wait=wait)
     
     async def notify_funding_income(
         self,
@@ -358,6 +487,7 @@ async def test_telegram():
         return
     
     success = await telegram.send_message("🤖 套利机器人连接测试成功!")
+    await telegram.close()
     if success:
         print("✅ Telegram 测试消息发送成功")
     else: